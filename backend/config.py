@@ -61,3 +61,69 @@ FIREBASE_DB_URL = os.getenv("FIREBASE_DB_URL")
 FIREBASE_SERVICE_ACCOUNT_JSON = os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON")
 FIREBASE_SERVICE_ACCOUNT_PATH = os.getenv("FIREBASE_SERVICE_ACCOUNT_PATH")
 FIREBASE_STORAGE_BUCKET = os.getenv("FIREBASE_STORAGE_BUCKET")
+
+
+# =================================================
+# Recommendation
+# =================================================
+
+CANDIDATE_INDEX_POLL_SECONDS = float(os.getenv("CANDIDATE_INDEX_POLL_SECONDS", "30"))
+CANDIDATE_INDEX_READY_TIMEOUT = float(os.getenv("CANDIDATE_INDEX_READY_TIMEOUT", "10"))
+RECOMMEND_RADIUS_KM = float(os.getenv("RECOMMEND_RADIUS_KM", "10"))
+# Smaller cells tighten the candidate set around the radius at the cost of more cell lookups.
+GEO_CELL_KM = float(os.getenv("GEO_CELL_KM", str(RECOMMEND_RADIUS_KM / 2)))
+
+# Approximate nearest-neighbour (IVF) retrieval before the hard filters.
+ANN_ENABLED = os.getenv("RECOMMEND_ANN_ENABLED", "false").lower() == "true"
+ANN_LISTS = int(os.getenv("RECOMMEND_ANN_LISTS", "0"))  # 0 = sqrt(n)
+ANN_PROBES = int(os.getenv("RECOMMEND_ANN_PROBES", "8"))
+ANN_CANDIDATES = int(os.getenv("RECOMMEND_ANN_CANDIDATES", "500"))
+
+# Per-user recommendation results, dropped early when the user's inputs change.
+RECOMMEND_CACHE_TTL_SECONDS = float(os.getenv("RECOMMEND_CACHE_TTL_SECONDS", "300"))
+RECOMMEND_CACHE_MAX_ENTRIES = int(os.getenv("RECOMMEND_CACHE_MAX_ENTRIES", "10000"))
+
+# recommendations/{uid} documents written by scripts/precompute_recommendations.py
+# are served until they are this old (or one of the listed users changes).
+RECOMMEND_PRECOMPUTED_MAX_AGE_SECONDS = float(
+    os.getenv("RECOMMEND_PRECOMPUTED_MAX_AGE_SECONDS", str(6 * 60 * 60))
+)
+
+# /api/users/list page size (?limit=), capped at the max.
+USERS_LIST_PAGE_SIZE = int(os.getenv("USERS_LIST_PAGE_SIZE", "50"))
+USERS_LIST_MAX_PAGE_SIZE = int(os.getenv("USERS_LIST_MAX_PAGE_SIZE", "200"))
+
+# Cell size of the stored geo_cell field. Firestore "in" takes at most 30
+# values, and a cell as wide as the radius keeps a query to 9-15 cells.
+MATCH_CELL_KM = float(os.getenv("MATCH_CELL_KM", str(RECOMMEND_RADIUS_KM)))
+
+# Shared index snapshot written by scripts/build_index_snapshot.py. When set,
+# recommend workers memory-map it instead of holding their own copy.
+INDEX_SNAPSHOT_DIR = os.getenv("INDEX_SNAPSHOT_DIR", "")
+INDEX_SNAPSHOT_CHECK_SECONDS = float(os.getenv("INDEX_SNAPSHOT_CHECK_SECONDS", "5"))
+INDEX_SNAPSHOT_KEEP = int(os.getenv("INDEX_SNAPSHOT_KEEP", "2"))
+
+# Per-user top-N neighbour lists kept up to date as embeddings change
+# (0 disables). Recommendations with top_k <= N become a lookup.
+NEIGHBOR_LIST_SIZE = int(os.getenv("RECOMMEND_NEIGHBOR_LIST_SIZE", "50"))
+
+# How users.embedding is written: float64 (list), float16 or int8 (packed
+# bytes, see services/embedding_codec.py). Readers accept every format.
+EMBEDDING_CODEC = os.getenv("EMBEDDING_CODEC", "float64")
+
+# /api/match/analyze-talk job queue: worker threads per process, and how many
+# jobs (queued + running) are admitted before new ones get 503 + Retry-After.
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+ANALYSIS_MAX_PENDING = int(os.getenv("ANALYSIS_MAX_PENDING", "8"))
+ANALYSIS_RETRY_AFTER_SECONDS = int(os.getenv("ANALYSIS_RETRY_AFTER_SECONDS", "15"))
+# Finished jobs kept for the status endpoint.
+ANALYSIS_JOB_HISTORY = int(os.getenv("ANALYSIS_JOB_HISTORY", "1000"))
+
+# Per-speaker Whisper transcription: 1 = sequential in the calling process,
+# N > 1 = a pool of N processes, each with cpu_count // N torch threads,
+# created once and kept for all talks.
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "1"))
+
+# Threads per analysis job for independent analyzer stages (text analyzers,
+# pitch, conversation embedding).
+ANALYSIS_STAGE_WORKERS = int(os.getenv("ANALYSIS_STAGE_WORKERS", "4"))
@@ -1,5 +1,11 @@
 from flask import Blueprint, session, jsonify
 from backend.services.firestore import get_firestore
+from backend.services.analysis_queue import get_analysis_queue
+from backend.services.candidate_index import get_candidate_index
+from backend.services.recommend_cache import get_recommend_cache
+from backend.services import pipeline_trace, segment_query
+from backend.services.index_snapshot import get_snapshot_reader
+from backend.services.user_projection import user_document
 
 debug_bp = Blueprint("debug", __name__, url_prefix="/api/debug")
 
@@ -15,25 +21,56 @@ def debug_me():
     if not me.exists:
         return jsonify(error="user not found"), 404
     
-    return jsonify(me.to_dict())
+    return jsonify(user_document(me.to_dict() or {}, include_embedding=True))
 
 @debug_bp.route("/all-users")
 def debug_all_users():
     db = get_firestore()
     all_users = []
     
-    for doc in db.collection("users").stream():
-        u = doc.to_dict()
-        all_users.append({
-            "id": u.get("id"),
-            "first_name": u.get("first_name"),
-            "last_name": u.get("last_name"),
-            "gender": u.get("gender"),
-            "age": u.get("age"),
-            "location": u.get("location"),
-            "onboarding_completed": u.get("onboarding_completed"),
-            "sexual_orientation": u.get("sexual_orientation"),
-            "age_preference": u.get("age_preference")
-        })
+    fields = [
+        "id",
+        "first_name",
+        "last_name",
+        "gender",
+        "age",
+        "location",
+        "onboarding_completed",
+        "sexual_orientation",
+        "age_preference",
+    ]
+    for doc in db.collection("users").select(fields).stream():
+        data = doc.to_dict() or {}
+        u = {field: data.get(field) for field in fields}
+        u["id"] = u["id"] or doc.id
+        all_users.append(u)
     
-    return jsonify(users=all_users, count=len(all_users))
\ No newline at end of file
+    return jsonify(users=all_users, count=len(all_users))
+
+@debug_bp.route("/candidate-index")
+def debug_candidate_index():
+    return jsonify(get_candidate_index().stats())
+
+@debug_bp.route("/segment-query")
+def debug_segment_query():
+    return jsonify(segment_query.stats())
+
+@debug_bp.route("/recommend-cache")
+def debug_recommend_cache():
+    return jsonify(get_recommend_cache().stats())
+
+@debug_bp.route("/index-snapshot")
+def debug_index_snapshot():
+    reader = get_snapshot_reader()
+    if reader is None:
+        return jsonify(enabled=False)
+    reader.current()
+    return jsonify(enabled=True, **reader.stats())
+
+@debug_bp.route("/pipeline-stages")
+def debug_pipeline_stages():
+    return jsonify(pipeline_trace.stats())
+
+@debug_bp.route("/analysis-queue")
+def debug_analysis_queue():
+    return jsonify(get_analysis_queue().stats())
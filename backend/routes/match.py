@@ -1,15 +1,21 @@
 from flask import Blueprint, request, jsonify, session
+from backend.config import ANALYSIS_RETRY_AFTER_SECONDS, DEBUG
+from backend.services.analysis_queue import QueueFull, get_analysis_queue
 from backend.services.recommend_service import recommend_for_user
 from backend.services.firestore import get_firestore
+from backend.services.pipeline_trace import Trace
+from backend.services.user_projection import fetch_public_profiles
 
 match_bp = Blueprint("match", __name__, url_prefix="/api/match")
 
 
 @match_bp.route("/analyze-talk", methods=["POST"])
 def analyze_talk():
-    # Lazy import to avoid heavy model/ML imports during app startup.
-    from backend.services.analysis_service import analyze_talk_pipeline
-
+    """
+    Queue the talk's analysis and return right away (202). Progress is on
+    /api/match/analyze-talk/<job_id> and, across processes, on
+    talk_history.analysis_status.
+    """
     data = request.get_json() or {}
     talk_id = data.get("talk_id")
 
@@ -17,27 +23,32 @@ def analyze_talk():
         return jsonify(success=False, message="talk_id required"), 400
 
     try:
-        result = analyze_talk_pipeline(talk_id)
-        if not result.get("success", True):
-            return jsonify(result), 500
-        return jsonify(success=True, talk_id=talk_id)
-    except Exception as e:
-        return jsonify(success=False, message="analysis failed", error=str(e)), 500
+        job, created = get_analysis_queue().submit(talk_id)
+    except QueueFull:
+        response = jsonify(success=False, message="analysis queue full, retry later")
+        response.headers["Retry-After"] = str(ANALYSIS_RETRY_AFTER_SECONDS)
+        return response, 503
+    return jsonify(success=True, created=created, **job.to_dict()), 202
+
+
+@match_bp.route("/analyze-talk/<job_id>", methods=["GET"])
+def analyze_talk_status(job_id):
+    job = get_analysis_queue().get(job_id)
+    if job is None:
+        return jsonify(success=False, message="job not found"), 404
+    return jsonify(success=True, **job.to_dict())
 
 @match_bp.route("/recommend", methods=["GET"])
 def recommend():
     uid = session.get("user_id") or request.headers.get("X-User-ID")
     if not uid:
         return jsonify(success=False, message="not logged in"), 401
-    users = recommend_for_user(uid)
-    db = get_firestore()
-    results = []
-    for user_id, _score in users:
-        doc = db.collection("users").document(user_id).get()
-        if not doc.exists:
-            continue
-        data = doc.to_dict() or {}
-        if "id" not in data:
-            data["id"] = doc.id
-        results.append(data)
-    return jsonify(users=results)
+    trace = Trace("recommend")
+    users = recommend_for_user(uid, use_precomputed=True, trace=trace)
+    with trace.stage("hydrate", len(users)) as stage:
+        profiles = fetch_public_profiles(get_firestore(), [user_id for user_id, _score in users])
+        stage["out"] = len(profiles)
+    # Per-stage counts/timings, only where debug_bp is registered.
+    if DEBUG and request.args.get("trace") == "1":
+        return jsonify(users=profiles, trace=trace.to_dict())
+    return jsonify(users=profiles)
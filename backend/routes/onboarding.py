@@ -2,6 +2,8 @@ from datetime import datetime
 from flask import Blueprint, jsonify, session
 
 from backend.services.firestore import get_firestore
+from backend.services.match_fields import with_match_fields
+from backend.services.recommend_cache import invalidate_user
 from backend.utils.request import get_json
 
 onboarding_bp = Blueprint("onboarding", __name__, url_prefix="/api/onboarding")
@@ -54,6 +56,9 @@ def save_onboarding():
     if phone:
         update_data["phone"] = phone
 
+    # 매칭용 파생 필드(geo_cell, gender_code, ...)를 함께 저장
+    update_data = with_match_fields(db, user_id, update_data)
     db.collection("users").document(user_id).set(update_data, merge=True)
+    invalidate_user(user_id)
 
     return jsonify(success=True)
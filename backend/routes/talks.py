@@ -10,7 +10,9 @@ from datetime import datetime
 from flask import Blueprint, jsonify, session, request
 from firebase_admin import firestore
 from google.api_core.exceptions import AlreadyExists
+from backend.services.candidate_index import loaded_candidate_index
 from backend.services.firestore import get_firestore
+from backend.services.recommend_cache import invalidate_user
 from backend.services.rtdb import get_rtdb
 from backend.services.user_profile_service import update_user_embedding, update_user_stats
 from backend.utils.request import get_json
@@ -385,18 +387,25 @@ def history_list():
     if not partner_ids:
         return jsonify(success=True, items=[])
 
-    # current user's block list
-    me = db.collection("users").document(user_id).get().to_dict() or {}
-    my_blocked = set(me.get("blocked_users") or [])
+    # partner names and both sides' block lists in one batched read
+    users_ref = db.collection("users")
+    refs = [users_ref.document(pid) for pid in [user_id] + partner_ids]
+    docs = {
+        doc.id: doc.to_dict() or {}
+        for doc in db.get_all(
+            refs,
+            field_paths=["first_name", "last_name", "firstName", "lastName", "blocked_users"],
+        )
+        if doc.exists
+    }
+    me = docs.get(user_id) or {}
 
     items = []
     for pid in partner_ids:
-        user_doc = db.collection("users").document(pid).get()
-        if not user_doc.exists:
+        if pid not in docs:
             continue
-        user_data = user_doc.to_dict() or {}
-        other_blocked = set(user_data.get("blocked_users") or [])
-        is_blocked = pid in my_blocked or user_id in other_blocked
+        user_data = docs[pid]
+        is_blocked = is_blocked_between(user_id, me, pid, user_data)
 
         items.append(
             {
@@ -431,10 +440,8 @@ def history_detail(partner_id):
     partner = partner_doc.to_dict() or {}
 
     # block check
-    me = db.collection("users").document(user_id).get().to_dict() or {}
-    my_blocked = set(me.get("blocked_users") or [])
-    other_blocked = set(partner.get("blocked_users") or [])
-    is_blocked = partner_id in my_blocked or user_id in other_blocked
+    me = db.collection("users").document(user_id).get(field_paths=["blocked_users"]).to_dict() or {}
+    is_blocked = is_blocked_between(user_id, me, partner_id, partner)
 
     talks_ref = db.collection("talk_history")
     query1 = (
@@ -594,6 +601,11 @@ def save_response():
                 },
                 merge=True,
             )
+            # Only a process that already keeps its own index needs telling.
+            index = loaded_candidate_index()
+            if index is not None:
+                index.add_block(user_id, partner_id)
+            invalidate_user(user_id, partner_id)
 
     return jsonify(success=True)
 
@@ -634,6 +646,15 @@ def get_go_no_go(request_id):
 # 🔥 Helper Functions
 # =========================
 
+def is_blocked_between(user_id, me, partner_id, partner):
+    """
+    어느 한쪽이라도 상대를 차단했는지 (두 사용자 문서의 blocked_users 기준)
+    """
+    return partner_id in (me.get("blocked_users") or []) or user_id in (
+        partner.get("blocked_users") or []
+    )
+
+
 def count_completed_talks(db, user_id, partner_id):
     """
     두 사용자 간 완료된 대화 수 계산 (top-level talk_history)
@@ -7,12 +7,25 @@ users.py - 사용자 관련 엔드포인트
 - list: 주변 사용자 목록
 """
 
+import base64
+import json
 from datetime import datetime
-from flask import Blueprint, jsonify, session
+from typing import Optional, Tuple
+
+import numpy as np
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
 from firebase_admin import firestore
+from backend.config import DEBUG, RECOMMEND_RADIUS_KM, USERS_LIST_MAX_PAGE_SIZE, USERS_LIST_PAGE_SIZE
+from backend.services.block_index import fetch_blocks
+from backend.services.candidate_filter import FILTER_FIELDS, filter_candidates, spatial_rows
 from backend.services.firestore import get_firestore
+from backend.services.index_snapshot import SnapshotIndex
+from backend.services.match_fields import with_match_fields
+from backend.services.pipeline_trace import Trace
+from backend.services.recommend_cache import invalidate_user
+from backend.services.recommend_service import candidate_source
+from backend.services.user_projection import fetch_public_profiles, iter_public_profiles, user_document
 from backend.utils.request import get_json
-import math
 
 users_bp = Blueprint("users", __name__, url_prefix="/api/users")
 
@@ -58,205 +71,126 @@ def update_location():
 
     db = get_firestore()
 
-    db.collection("users").document(user_id).set({
+    update_data = with_match_fields(db, user_id, {
         "location": {
             "lat": data.get("lat"),
             "lng": data.get("lng")
         }
-    }, merge=True)
+    })
+    db.collection("users").document(user_id).set(update_data, merge=True)
+    invalidate_user(user_id)
 
     return jsonify(success=True)
 
 
-# =========================
-# 거리 계산
-# =========================
-def distance_km(lat1, lng1, lat2, lng2):
-    """두 좌표 간 거리 계산 (km)"""
-    R = 6371
-    d_lat = math.radians(lat2 - lat1)
-    d_lng = math.radians(lng2 - lng1)
-
-    a = (
-        math.sin(d_lat/2)**2 +
-        math.cos(math.radians(lat1)) *
-        math.cos(math.radians(lat2)) *
-        math.sin(d_lng/2)**2
-    )
-
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-
-
-# =========================
-# 성적 지향 매칭
-# =========================
-def matches_orientation(orientation, target_gender):
-    """
-    성적 지향과 상대 성별 매칭 확인
-    
-    orientation: 내 성적 지향 (예: "men", "women", "all types of genders")
-    target_gender: 상대방의 성별 (예: "man", "woman", "non-binary")
-    """
-    if not orientation:
-        return True  # 기본값: 모두 허용
-    
-    orientation = orientation.lower()
-    target_gender = target_gender.lower()
-    
-    # "all types of genders" → 모두 허용
-    if "all types" in orientation:
-        return True
-    
-    # "men" → man만
-    if orientation == "men":
-        return target_gender == "man"
-    
-    # "women" → woman만
-    if orientation == "women":
-        return target_gender == "woman"
-    
-    # "men and women" → man 또는 woman
-    if orientation == "men and women":
-        return target_gender in ["man", "woman"]
-    
-    # "men and non-binary people"
-    if "men and non-binary" in orientation:
-        return target_gender in ["man", "non-binary"]
-    
-    # "women and non-binary people"
-    if "women and non-binary" in orientation:
-        return target_gender in ["woman", "non-binary"]
-    
-    return False
-
-
 # =========================
 # Nearby Users List
 # =========================
 @users_bp.route("/list")
 def list_users():
     """
-    주변 사용자 목록 (필터링 적용)
-    
+    주변 사용자 목록 (필터링 적용, 가까운 순 커서 페이지네이션)
+
     필터:
-    - 거리 10km 이내
+    - 거리 RECOMMEND_RADIUS_KM (기본 10km) 이내
     - 성적 지향 일치 (양방향)
     - 나이 선호 일치 (양방향)
+
+    쿼리:
+    - limit: 페이지 크기 (기본 USERS_LIST_PAGE_SIZE, 최대 USERS_LIST_MAX_PAGE_SIZE)
+    - cursor: 이전 응답의 next_cursor
+    - format=ndjson: 한 줄에 사용자 하나씩 스트리밍, 마지막 줄은 {"next_cursor": ...}
+    - trace=1: 단계별 후보 수/소요 시간 (DEBUG 환경만)
     """
     uid = session.get("user_id")
     if not uid:
         return jsonify(success=False), 401
 
+    try:
+        limit = int(request.args.get("limit", USERS_LIST_PAGE_SIZE))
+    except ValueError:
+        return jsonify(success=False, message="limit must be an integer"), 400
+    limit = max(1, min(limit, USERS_LIST_MAX_PAGE_SIZE))
+
+    after = None
+    if request.args.get("cursor"):
+        after = _decode_cursor(request.args["cursor"])
+        if after is None:
+            return jsonify(success=False, message="invalid cursor"), 400
+
     db = get_firestore()
-    me = db.collection("users").document(uid).get().to_dict()
-
-    print(f"\n=== USER LIST DEBUG ===")
-    print(f"My ID: {uid}")
-    print(f"My profile: {me}")
-
-    my_loc = me.get("location")
-    my_gender = me.get("gender")
-    my_age = me.get("age")
-    my_sexual_orientation = me.get("sexual_orientation")
-    my_age_pref = me.get("age_preference", {})
-    my_blocked = set(me.get("blocked_users") or [])
-
-    print(f"My location: {my_loc}")
-    print(f"My gender: {my_gender}, age: {my_age}")
-    print(f"My preferences: orientation={my_sexual_orientation}, age_range={my_age_pref}")
-
-    users = []
-    total_count = 0
-    filtered_stats = {
-        "same_user": 0,
-        "no_onboarding": 0,
-        "no_location": 0,
-        "too_far": 0,
-        "orientation_mismatch": 0,
-        "age_mismatch": 0,
-        "reverse_orientation": 0,
-        "reverse_age": 0,
-        "passed": 0
-    }
-
-    for doc in db.collection("users").stream():
-        u = doc.to_dict()
-        if "id" not in u:
-            u["id"] = doc.id
-        total_count += 1
-
-        # 본인 제외
-        if u["id"] == uid:
-            filtered_stats["same_user"] += 1
-            continue
-
-        # 차단 확인 (양방향)
-        other_blocked = set(u.get("blocked_users") or [])
-        if u.get("id") in my_blocked or uid in other_blocked:
-            filtered_stats["same_user"] += 1
-            continue
-
-        # 온보딩 완료 확인
-        if not u.get("onboarding_completed"):
-            filtered_stats["no_onboarding"] += 1
-            continue
-
-        # 위치 확인
-        loc = u.get("location")
-        if not loc or not my_loc:
-            filtered_stats["no_location"] += 1
-            continue
-
-        # 거리 체크 (10km)
-        d = distance_km(
-            my_loc["lat"], my_loc["lng"],
-            loc["lat"], loc["lng"]
-        )
-        if d > 10:
-            filtered_stats["too_far"] += 1
-            continue
-
-        other_gender = u.get("gender")
-        other_age = u.get("age")
-        other_sexual_orientation = u.get("sexual_orientation")
-        other_age_pref = u.get("age_preference", {})
-
-        if not other_gender or not other_age:
-            filtered_stats["no_location"] += 1
-            continue
-
-        # 내가 상대를 선호하는지
-        if not matches_orientation(my_sexual_orientation, other_gender):
-            filtered_stats["orientation_mismatch"] += 1
-            continue
-
-        if my_age_pref:
-            if not (my_age_pref.get("min", 0) <= other_age <= my_age_pref.get("max", 100)):
-                filtered_stats["age_mismatch"] += 1
-                continue
-
-        # 상대가 나를 선호하는지 (양방향 확인)
-        if not matches_orientation(other_sexual_orientation, my_gender):
-            filtered_stats["reverse_orientation"] += 1
-            continue
-
-        if other_age_pref:
-            if not (other_age_pref.get("min", 0) <= my_age <= other_age_pref.get("max", 100)):
-                filtered_stats["reverse_age"] += 1
-                continue
-
-        # 모든 필터 통과
-        filtered_stats["passed"] += 1
-        users.append(u)
-
-    print(f"\nTotal users in DB: {total_count}")
-    print(f"Filter results:")
-    for key, value in filtered_stats.items():
-        print(f"  {key}: {value}")
-    print(f"Final result: {len(users)} users")
-    print("======================\n")
-
-    return jsonify(success=True, users=users)
+    me = db.collection("users").document(uid).get(field_paths=list(FILTER_FIELDS)).to_dict() or {}
+
+    trace = Trace("users_list")
+
+    # 공유 스냅샷 → 로드된 프로세스 인덱스 → 주변 호환 세그먼트 조회 순
+    index = candidate_source(db, uid, RECOMMEND_RADIUS_KM, trace, me=me)
+    if isinstance(index, SnapshotIndex):
+        # 스냅샷 이후의 차단(양방향)도 반영
+        with trace.stage("blocks") as stage:
+            blocked = fetch_blocks(db, uid, own=me.get("blocked_users") or [])
+            me = {**me, "blocked_users": sorted(blocked)}
+            stage["out"] = len(blocked)
+
+    with index.lock:
+        # 격자 셀 사전필터 → NumPy 마스크로 양방향 하드 필터
+        with trace.stage("spatial") as stage:
+            near = spatial_rows(index, me, RECOMMEND_RADIUS_KM)
+            stage["out"] = near.size
+        with trace.stage("filter", near.size) as stage:
+            found = filter_candidates(index, uid, me, RECOMMEND_RADIUS_KM, rows=near)
+            stage["out"] = len(found)
+
+    # (거리, id) 순으로 정렬해 동일 거리에서도 커서가 안정적이도록 한다
+    with trace.stage("paginate", len(found)) as stage:
+        ids = np.array(found.ids, dtype=str)
+        order = np.lexsort((ids, found.distances))
+        ids, dists = ids[order], found.distances[order]
+
+        start = 0
+        if after is not None:
+            after_dist, after_id = after
+            later = (dists > after_dist) | ((dists == after_dist) & (ids > after_id))
+            start = int(np.argmax(later)) if later.any() else len(ids)
+        page_ids = ids[start:start + limit].tolist()
+        next_cursor = None
+        if start + limit < len(ids):
+            last = start + limit - 1
+            next_cursor = _encode_cursor(float(dists[last]), str(ids[last]))
+        stage["out"] = len(page_ids)
+
+    # 페이지에 들어간 사용자만 공개 프로필 필드를 조회
+    if request.args.get("format") == "ndjson":
+        def stream():
+            with trace.stage("hydrate", len(page_ids)) as stage:
+                stage["out"] = 0
+                for user in iter_public_profiles(db, page_ids, chunk_size=25):
+                    stage["out"] += 1
+                    yield json.dumps(user) + "\n"
+            yield json.dumps({"next_cursor": next_cursor}) + "\n"
+
+        return Response(stream_with_context(stream()), mimetype="application/x-ndjson")
+
+    with trace.stage("hydrate", len(page_ids)) as stage:
+        users = fetch_public_profiles(db, page_ids)
+        stage["out"] = len(users)
+    if DEBUG and request.args.get("trace") == "1":
+        return jsonify(success=True, users=users, next_cursor=next_cursor, trace=trace.to_dict())
+    return jsonify(success=True, users=users, next_cursor=next_cursor)
+
+
+def _encode_cursor(dist: float, other_id: str) -> str:
+    raw = json.dumps([dist, other_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Optional[Tuple[float, str]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        dist, other_id = json.loads(raw)
+        return float(dist), str(other_id)
+    except (ValueError, TypeError):
+        return None
 
 
 # =========================
@@ -275,7 +209,7 @@ def get_profile():
     if not user:
         return jsonify(success=False, message="user not found"), 404
     
-    return jsonify(success=True, user=user)
+    return jsonify(success=True, user=user_document(user))
 
 
 # =========================
@@ -309,7 +243,9 @@ def update_profile():
     if "age_preference" in data:
         update_data["age_preference"] = data["age_preference"]
     
+    update_data = with_match_fields(db, user_id, update_data)
     db.collection("users").document(user_id).set(update_data, merge=True)
+    invalidate_user(user_id)
     
     return jsonify(success=True)
 
@@ -0,0 +1,56 @@
+"""
+Write derived matching fields (geo_cell, gender_code, orientation_mask, ...)
+onto every existing users document.
+
+    python -m backend.scripts.backfill_match_fields [--dry-run]
+
+New writes get them from the onboarding/location/profile routes; this is for
+documents saved before those fields existed, or after MATCH_CELL_KM changes.
+"""
+
+import argparse
+import time
+
+from backend.services.firestore import get_firestore
+from backend.services.match_fields import DERIVED_FIELDS, SOURCE_FIELDS, derive_match_fields
+
+# Firestore batches accept at most 500 writes.
+BATCH_WRITES = 500
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    db = get_firestore()
+    users = db.collection("users")
+    started = time.perf_counter()
+
+    batch = db.batch()
+    pending = scanned = changed = 0
+    for doc in users.select(list(SOURCE_FIELDS + DERIVED_FIELDS)).stream():
+        scanned += 1
+        data = doc.to_dict() or {}
+        derived = derive_match_fields(data)
+        if all(data.get(key) == value for key, value in derived.items()):
+            continue
+        changed += 1
+        if args.dry_run:
+            continue
+        batch.set(users.document(doc.id), derived, merge=True)
+        pending += 1
+        if pending == BATCH_WRITES:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+
+    elapsed = time.perf_counter() - started
+    verb = "would update" if args.dry_run else "updated"
+    print(f"Scanned {scanned} users, {verb} {changed} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
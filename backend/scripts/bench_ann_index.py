@@ -0,0 +1,80 @@
+"""
+Recall/latency of the IVF embedding index against an exact cosine scan.
+
+    python -m backend.scripts.bench_ann_index --n 100000 --probes 1 4 8 16 32
+
+Vectors are synthetic, clustered and unit-length, with the same dimension as
+the sentence-transformer user embeddings (384).
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from backend.services.ann_index import IVFIndex
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    x = centers[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = vectors @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=0, help="0 = sqrt(n)")
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.n, args.dim, args.clusters, args.seed)
+    rows = np.arange(args.n)
+
+    ivf = IVFIndex(n_lists=args.lists)
+    t0 = time.perf_counter()
+    ivf.train(vectors, rows, seed=args.seed)
+    train_s = time.perf_counter() - t0
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.choice(args.n, size=args.queries, replace=False)]
+
+    exact_ms, truth = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        truth.append(set(exact_top_k(vectors, q, args.k).tolist()))
+        exact_ms.append((time.perf_counter() - t0) * 1000)
+
+    print(f"n={args.n} dim={args.dim} lists={len(ivf.centroids)} k={args.k} train={train_s:.2f}s")
+    print(f"{'probes':>7} {'recall@k':>9} {'scanned':>9} {'p50 ms':>8} {'exact ms':>9}")
+    for n_probe in args.probes:
+        recalls, latencies, scanned = [], [], []
+        for q, expected in zip(queries, truth):
+            t0 = time.perf_counter()
+            found, _ = ivf.search(vectors, q, args.k, n_probe=n_probe)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            recalls.append(len(expected & set(found.tolist())) / args.k)
+            scanned.append(len(ivf.probe_rows(q, n_probe)))
+        print(
+            f"{n_probe:>7} {statistics.mean(recalls):>9.3f} {statistics.mean(scanned):>9.0f} "
+            f"{statistics.median(latencies):>8.3f} {statistics.median(exact_ms):>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
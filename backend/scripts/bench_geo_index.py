@@ -0,0 +1,106 @@
+"""
+Benchmark the geo grid prefilter against a full haversine scan.
+
+    python -m backend.scripts.bench_geo_index --sizes 1000 10000 100000
+
+For each layout/population it reports the grid candidate-set size, the number
+of users actually within the radius, and the per-query latency of both paths.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+from backend.services.geo_index import GeoGrid, haversine_km
+
+SEOUL = (37.5665, 126.9780)
+
+
+def dense_city(n: int, rng: random.Random) -> List[Tuple[float, float]]:
+    # Most users within ~10 km of the city centre, a thin suburban tail.
+    pts = []
+    for _ in range(n):
+        spread = 0.08 if rng.random() < 0.85 else 0.3
+        pts.append((rng.gauss(SEOUL[0], spread), rng.gauss(SEOUL[1], spread)))
+    return pts
+
+
+def sparse_country(n: int, rng: random.Random) -> List[Tuple[float, float]]:
+    # Uniform over a Korea-sized bounding box.
+    return [(rng.uniform(33.0, 38.5), rng.uniform(126.0, 129.5)) for _ in range(n)]
+
+
+LAYOUTS: Dict[str, Callable[[int, random.Random], List[Tuple[float, float]]]] = {
+    "dense-city": dense_city,
+    "sparse": sparse_country,
+}
+
+
+def _scan(points, lat, lng, radius_km) -> int:
+    return sum(1 for p_lat, p_lng in points if haversine_km(lat, lng, p_lat, p_lng) <= radius_km)
+
+
+def run(layout: str, n: int, radius_km: float, cell_km: float, queries: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    points = LAYOUTS[layout](n, rng)
+
+    grid = GeoGrid(cell_km)
+    t0 = time.perf_counter()
+    for i, (lat, lng) in enumerate(points):
+        grid.insert(str(i), lat, lng)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    probes = [points[rng.randrange(n)] for _ in range(queries)]
+    cand_sizes, hits, grid_ms, scan_ms = [], [], [], []
+    for lat, lng in probes:
+        t0 = time.perf_counter()
+        found = grid.within(lat, lng, radius_km)
+        grid_ms.append((time.perf_counter() - t0) * 1000)
+        cand_sizes.append(len(grid.candidates(lat, lng, radius_km)))
+        hits.append(len(found))
+
+    # The full scan is slow at large n; sample fewer probes.
+    for lat, lng in probes[: max(1, queries // 10)]:
+        t0 = time.perf_counter()
+        expected = _scan(points, lat, lng, radius_km)
+        scan_ms.append((time.perf_counter() - t0) * 1000)
+        if expected != len(grid.within(lat, lng, radius_km)):
+            raise AssertionError("grid result differs from full scan")
+
+    return {
+        "layout": layout,
+        "n": n,
+        "build_ms": build_ms,
+        "candidates": statistics.mean(cand_sizes),
+        "within": statistics.mean(hits),
+        "grid_ms": statistics.median(grid_ms),
+        "scan_ms": statistics.median(scan_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--layouts", nargs="+", default=list(LAYOUTS), choices=list(LAYOUTS))
+    parser.add_argument("--radius-km", type=float, default=10.0)
+    parser.add_argument("--cell-km", type=float, default=None)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    cell_km = args.cell_km or args.radius_km / 2
+    print(f"radius={args.radius_km}km cell={cell_km}km queries={args.queries}")
+    print(f"{'layout':<11} {'n':>8} {'build ms':>9} {'cand':>9} {'within':>9} {'grid ms':>9} {'scan ms':>9}")
+    for layout in args.layouts:
+        for n in args.sizes:
+            r = run(layout, n, args.radius_km, cell_km, args.queries, args.seed)
+            print(
+                f"{r['layout']:<11} {r['n']:>8} {r['build_ms']:>9.1f} {r['candidates']:>9.1f} "
+                f"{r['within']:>9.1f} {r['grid_ms']:>9.3f} {r['scan_ms']:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Bytes and decode time of full vs field-projected reads of the users collection.
+
+    python -m backend.scripts.bench_projection --sample 50
+
+Compares, against the configured Firestore project:
+  index scan   - collection stream vs select(INDEX_FIELDS) (candidate index load)
+  all-users    - collection stream vs the /api/debug/all-users projection
+  hydrate      - get_all of full docs vs PUBLIC_PROFILE_FIELDS for `--sample`
+                 users (what /api/users/list and /api/match/recommend return)
+
+Bytes are the JSON-encoded size of the decoded documents, which tracks the
+wire size closely enough to compare projections.
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Iterable, Optional, Sequence
+
+from backend.services.candidate_index import INDEX_FIELDS
+from backend.services.firestore import get_firestore
+from backend.services.user_projection import PUBLIC_PROFILE_FIELDS
+
+DEBUG_FIELDS = [
+    "id",
+    "first_name",
+    "last_name",
+    "gender",
+    "age",
+    "location",
+    "onboarding_completed",
+    "sexual_orientation",
+    "age_preference",
+]
+
+
+def measure(read: Callable[[], Iterable]) -> dict:
+    started = time.perf_counter()
+    snaps = list(read())
+    fetch_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    docs = [snap.to_dict() or {} for snap in snaps]
+    decode_s = time.perf_counter() - started
+
+    size = sum(len(json.dumps(doc, default=str)) for doc in docs)
+    return {"docs": len(docs), "bytes": size, "fetch_ms": fetch_s * 1000, "decode_ms": decode_s * 1000}
+
+
+def report(name: str, full: dict, projected: dict) -> None:
+    ratio = projected["bytes"] / full["bytes"] if full["bytes"] else 0.0
+    for label, row in (("full", full), ("projected", projected)):
+        print(
+            f"{name:<12} {label:<10} {row['docs']:>7} {row['bytes']:>12} "
+            f"{row['fetch_ms']:>10.1f} {row['decode_ms']:>10.1f}"
+        )
+    print(f"{'':<12} bytes ratio {ratio:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sample", type=int, default=50, help="users hydrated per request")
+    args = parser.parse_args()
+
+    db = get_firestore()
+    users = db.collection("users")
+
+    def stream(fields: Optional[Sequence[str]] = None):
+        return (users.select(list(fields)) if fields else users).stream()
+
+    print(f"{'path':<12} {'read':<10} {'docs':>7} {'bytes':>12} {'fetch ms':>10} {'decode ms':>10}")
+    report("index scan", measure(stream), measure(lambda: stream(INDEX_FIELDS)))
+    report("all-users", measure(stream), measure(lambda: stream(DEBUG_FIELDS)))
+
+    ids = [doc.id for doc in users.select([]).limit(args.sample).stream()]
+    refs = [users.document(uid) for uid in ids]
+    report(
+        "hydrate",
+        measure(lambda: db.get_all(refs)),
+        measure(lambda: db.get_all(refs, field_paths=list(PUBLIC_PROFILE_FIELDS))),
+    )
+
+
+if __name__ == "__main__":
+    main()
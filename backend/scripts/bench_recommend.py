@@ -0,0 +1,147 @@
+"""
+Recommendation benchmark over synthetic populations.
+
+    python -m backend.scripts.bench_recommend --scales 10000 100000 1000000
+
+Each scale runs in a fresh process against an in-memory store filled by
+synthetic_population, so peak RSS is per scale. Reported per path:
+p50/p99 latency over `--queries` random onboarded users, and mean candidate
+counts (grid neighbourhood -> users passing every filter).
+
+Paths:
+  recommend     recommend_for_users, exact cosine over filtered candidates
+  recommend_ann same, with the IVF shortlist in front (separate index)
+  filter        filter_candidates fast path (no per-reason stats)
+  filter_stats  filter_candidates with per-reason stats (full cascade)
+  list_users    GET /api/users/list first page, through the Flask route
+"""
+
+import argparse
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from backend.config import RECOMMEND_RADIUS_KM
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def timed(fn: Callable[[str], int], uids: List[str]) -> Dict[str, float]:
+    latencies, counts = [], []
+    for uid in uids:
+        started = time.perf_counter()
+        count = fn(uid)
+        latencies.append((time.perf_counter() - started) * 1000)
+        counts.append(count)
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "passed": statistics.mean(counts) if counts else 0.0,
+    }
+
+
+def run_scale(n: int, dim: int, queries: int, seed: int, ann: bool) -> Dict:
+    from flask import Flask
+
+    from backend.routes.users import users_bp
+    from backend.scripts.synthetic_population import populate
+    from backend.services.candidate_filter import empty_stats, filter_candidates
+    from backend.services.candidate_index import CandidateIndex, get_candidate_index
+    from backend.services.firestore import use_firestore
+    from backend.services.recommend_service import recommend_for_users
+
+    started = time.perf_counter()
+    store = populate(n=n, dim=dim, seed=seed)
+    use_firestore(store)
+    generate_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = get_candidate_index()
+    index_s = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed + 1)
+    eligible = [
+        uid for uid, record in index.items()
+        if record.get("onboarding_completed") and record.get("location")
+    ]
+    uids = [eligible[i] for i in rng.choice(len(eligible), size=min(queries, len(eligible)), replace=False)]
+
+    neighbourhood = []
+    for uid in uids:
+        loc = index.get(uid)["location"]
+        neighbourhood.append(len(index.grid.candidates(loc["lat"], loc["lng"], RECOMMEND_RADIUS_KM)))
+
+    def recommend(uid: str, idx=None) -> int:
+        return len(recommend_for_users([uid], radius_km=RECOMMEND_RADIUS_KM, index=idx)[uid])
+
+    def fast_filter(uid: str) -> int:
+        return len(filter_candidates(index, uid, index.get(uid), RECOMMEND_RADIUS_KM))
+
+    def stats_filter(uid: str) -> int:
+        return len(filter_candidates(index, uid, index.get(uid), RECOMMEND_RADIUS_KM, stats=empty_stats()))
+
+    app = Flask(__name__)
+    app.secret_key = "bench"
+    app.register_blueprint(users_bp)
+    client = app.test_client()
+
+    def list_users(uid: str) -> int:
+        with client.session_transaction() as session:
+            session["user_id"] = uid
+        return len(client.get("/api/users/list").get_json()["users"])
+
+    paths = {
+        "recommend": timed(recommend, uids),
+        "filter": timed(fast_filter, uids),
+        "filter_stats": timed(stats_filter, uids),
+        "list_users": timed(list_users, uids),
+    }
+    if ann and dim:
+        ann_index = CandidateIndex(db=store, ann_enabled=True)
+        ann_index.reload()
+        ann_index.ann_index()
+        paths["recommend_ann"] = timed(lambda uid: recommend(uid, ann_index), uids)
+
+    return {
+        "n": n,
+        "generate_s": generate_s,
+        "index_s": index_s,
+        "neighbourhood": statistics.mean(neighbourhood) if neighbourhood else 0.0,
+        # ru_maxrss is KiB on Linux.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "paths": paths,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ann", action="store_true", help="also time the IVF path")
+    args = parser.parse_args()
+
+    for n in args.scales:
+        # One process per scale keeps peak RSS from carrying over.
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(run_scale, n, args.dim, args.queries, args.seed, args.ann).result()
+
+        print(
+            f"\nn={result['n']} generate={result['generate_s']:.1f}s index={result['index_s']:.1f}s "
+            f"peak_rss={result['peak_rss_mb']:.0f}MB neighbourhood={result['neighbourhood']:.0f}"
+        )
+        print(f"{'path':<14} {'p50 ms':>9} {'p99 ms':>9} {'passed':>9}")
+        for name, row in result["paths"].items():
+            print(f"{name:<14} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['passed']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
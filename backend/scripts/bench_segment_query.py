@@ -0,0 +1,68 @@
+"""
+Firestore reads per request: segment-keyed queries vs a full users scan.
+
+    python -m backend.scripts.bench_segment_query --n 100000 --queries 200
+
+Runs on a synthetic population in a MemoryFirestore, which counts billable
+document reads. For each sampled user it compares the reads and results of
+segment_index (cold-start path) against the fully loaded CandidateIndex.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from backend.config import RECOMMEND_RADIUS_KM
+from backend.scripts.synthetic_population import populate
+from backend.services.candidate_filter import filter_candidates
+from backend.services.candidate_index import CandidateIndex
+from backend.services.segment_query import segment_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=0, help="embedding dim (0 = none)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = populate(n=args.n, dim=args.dim, seed=args.seed)
+
+    before = store.reads
+    started = time.perf_counter()
+    full = CandidateIndex(db=store)
+    full.reload()
+    scan_reads = store.reads - before
+    scan_ms = (time.perf_counter() - started) * 1000
+
+    eligible = [uid for uid, r in full.items() if r.get("onboarding_completed") and r.get("location")]
+    rng = np.random.default_rng(args.seed + 1)
+    sample = [eligible[i] for i in rng.choice(len(eligible), size=min(args.queries, len(eligible)), replace=False)]
+
+    reads, latencies, mismatches = [], [], 0
+    for uid in sample:
+        before = store.reads
+        started = time.perf_counter()
+        local = segment_index(store, uid, RECOMMEND_RADIUS_KM)
+        found = filter_candidates(local, uid, local.get(uid), RECOMMEND_RADIUS_KM)
+        latencies.append((time.perf_counter() - started) * 1000)
+        reads.append(store.reads - before)
+
+        expected = filter_candidates(full, uid, full.get(uid), RECOMMEND_RADIUS_KM)
+        if sorted(found.ids) != sorted(expected.ids):
+            mismatches += 1
+
+    print(f"users={args.n} full scan: reads={scan_reads} time={scan_ms:.0f}ms")
+    print(
+        f"segment query: reads/request mean={statistics.mean(reads):.0f} "
+        f"p99={np.percentile(reads, 99):.0f} max={max(reads)} "
+        f"latency p50={np.percentile(latencies, 50):.1f}ms p99={np.percentile(latencies, 99):.1f}ms"
+    )
+    print(f"result mismatches vs full index: {mismatches}/{len(sample)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Sequential vs parallel per-speaker Whisper transcription.
+
+    TRANSCRIBE_WORKERS=2 python -m backend.scripts.bench_transcription a.wav b.wav
+
+Each wav is treated as one speaker. Parallel mode uses the shared pool of
+TRANSCRIBE_WORKERS processes. Both modes run once to load their models
+before timing, then `--repeat` timed runs each. Prints wall time per
+mode, the speedup, and whether the merged conversations are identical.
+"""
+
+import argparse
+import os
+import time
+
+from backend.config import TRANSCRIBE_WORKERS
+from backend.services.analysis.loaders.conversation_builder import (
+    build_conversation,
+    get_whisper_model,
+    torch_threads_per_worker,
+)
+
+
+def timed(speaker_audio_map, parallel: bool, repeat: int):
+    result = None
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = build_conversation("bench", speaker_audio_map, parallel=parallel)
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("wavs", nargs="+", help="one wav per speaker")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    speaker_audio_map = {f"speaker_{i + 1}": path for i, path in enumerate(args.wavs)}
+    workers = TRANSCRIBE_WORKERS
+
+    get_whisper_model()
+    build_conversation("warmup", speaker_audio_map, parallel=True)
+
+    seq_s, seq = timed(speaker_audio_map, False, args.repeat)
+    par_s, par = timed(speaker_audio_map, True, args.repeat)
+
+    print(
+        f"cpus={os.cpu_count()} speakers={len(speaker_audio_map)} workers={workers} "
+        f"torch_threads/worker={torch_threads_per_worker(workers)}"
+    )
+    print(f"sequential {seq_s:.2f}s  parallel {par_s:.2f}s  speedup {seq_s / par_s:.2f}x")
+    print(f"identical output: {seq['conversation'] == par['conversation']}")
+
+
+if __name__ == "__main__":
+    main()
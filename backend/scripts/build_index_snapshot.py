@@ -0,0 +1,49 @@
+"""
+Write the shared candidate index snapshot for recommend workers.
+
+    INDEX_SNAPSHOT_DIR=/dev/shm/matching python -m backend.scripts.build_index_snapshot --interval 60
+
+Keeps one CandidateIndex in sync with the users collection (snapshot
+listener, or polling) and writes a new generation every `--interval` seconds,
+swapping CURRENT atomically. Workers started with the same INDEX_SNAPSHOT_DIR
+map the latest generation; see services/index_snapshot.py. Use --once for a
+single generation (e.g. from cron).
+"""
+
+import argparse
+import time
+
+from backend.config import INDEX_SNAPSHOT_DIR, INDEX_SNAPSHOT_KEEP
+from backend.services.candidate_index import CandidateIndex
+from backend.services.index_snapshot import write_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", default=INDEX_SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds between generations")
+    parser.add_argument("--keep", type=int, default=INDEX_SNAPSHOT_KEEP, help="generations kept on disk")
+    parser.add_argument("--once", action="store_true", help="write one generation and exit")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("set --dir or INDEX_SNAPSHOT_DIR")
+
+    index = CandidateIndex(ann_enabled=False)
+    started = time.perf_counter()
+    if args.once:
+        index.reload()
+    else:
+        index.ensure_ready()
+    print(f"Loaded {len(index)} users in {time.perf_counter() - started:.1f}s")
+
+    while True:
+        started = time.perf_counter()
+        name = write_snapshot(index, args.dir, keep=args.keep)
+        print(f"Wrote {name} ({len(index)} users) in {time.perf_counter() - started:.1f}s")
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Check that routes returning a user's own document serialize under every
+embedding codec.
+
+    python -m backend.scripts.check_profile_json
+
+Runs against an in-memory store (no Firestore project needed): for each of
+float64/float16/int8 it writes a user embedding in that codec, then calls
+GET /api/users/profile and /api/debug/me through a Flask test client.
+Exits non-zero if any response fails to serialize.
+"""
+
+import sys
+
+import numpy as np
+from flask import Flask
+
+from backend.routes.debug import debug_bp
+from backend.routes.users import users_bp
+from backend.services.embedding_codec import CODECS, LIST_CODEC, embedding_fields
+from backend.services.firestore import use_firestore
+from backend.services.memory_store import MemoryFirestore
+
+ROUTES = ("/api/users/profile", "/api/debug/me")
+
+
+def main():
+    app = Flask(__name__)
+    app.secret_key = "check-profile-json"
+    app.register_blueprint(users_bp)
+    app.register_blueprint(debug_bp)
+
+    db = MemoryFirestore()
+    use_firestore(db)
+    vector = np.random.default_rng(0).normal(size=384)
+
+    failures = 0
+    for codec in (LIST_CODEC, *CODECS):
+        uid = f"check-{codec}"
+        db.collection("users").document(uid).set(
+            {"id": uid, "first_name": "Check", "embedding": embedding_fields(vector, codec)},
+            merge=True,
+        )
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = uid
+        for route in ROUTES:
+            try:
+                resp = client.get(route)
+                ok = resp.status_code == 200 and resp.get_json() is not None
+                detail = resp.status_code
+            except TypeError as e:
+                ok, detail = False, e
+            failures += not ok
+            print(f"{codec:<8} {route:<22} {'ok' if ok else 'FAIL'} ({detail})")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
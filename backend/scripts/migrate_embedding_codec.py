@@ -0,0 +1,88 @@
+"""
+Rewrite users.embedding in another storage format.
+
+    python -m backend.scripts.migrate_embedding_codec --codec float16 [--dry-run]
+
+Converts every user whose embedding is not already in `--codec` (default:
+EMBEDDING_CODEC) to it: packed bytes for float16/int8, the float list for
+float64. Only the embedding map is read. Reports stored vector bytes before
+and after (Firestore stores a double as 8 bytes).
+"""
+
+import argparse
+import time
+
+from backend.config import EMBEDDING_CODEC
+from backend.services.embedding_codec import (
+    CODECS,
+    LIST_CODEC,
+    embedding_fields,
+    read_vector,
+)
+from backend.services.firestore import get_firestore
+
+# Firestore batches accept at most 500 writes.
+BATCH_WRITES = 500
+
+
+def stored_codec(embedding) -> str:
+    packed = embedding.get("packed")
+    if isinstance(packed, (bytes, bytearray)) and len(packed) > 1:
+        code = packed[1]
+        return next((name for name, value in CODECS.items() if value == code), "unknown")
+    return LIST_CODEC
+
+
+def stored_bytes(embedding) -> int:
+    packed = embedding.get("packed")
+    if isinstance(packed, (bytes, bytearray)):
+        return len(packed)
+    return 8 * len(embedding.get("vector") or [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--codec", default=EMBEDDING_CODEC, choices=[LIST_CODEC, *CODECS])
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    db = get_firestore()
+    users = db.collection("users")
+    started = time.perf_counter()
+
+    batch = db.batch()
+    pending = scanned = changed = 0
+    before = after = 0
+    for doc in users.select(["embedding"]).stream():
+        scanned += 1
+        embedding = (doc.to_dict() or {}).get("embedding")
+        if not isinstance(embedding, dict) or stored_codec(embedding) == args.codec:
+            continue
+        vector = read_vector(embedding)
+        if vector is None or len(vector) == 0:
+            continue
+        fields = embedding_fields(vector, args.codec)
+        changed += 1
+        before += stored_bytes(embedding)
+        after += stored_bytes(fields)
+        if args.dry_run:
+            continue
+        batch.update(users.document(doc.id), {f"embedding.{key}": value for key, value in fields.items()})
+        pending += 1
+        if pending == BATCH_WRITES:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+
+    elapsed = time.perf_counter() - started
+    verb = "would convert" if args.dry_run else "converted"
+    print(
+        f"Scanned {scanned} users, {verb} {changed} to {args.codec} in {elapsed:.1f}s "
+        f"(vector bytes {before} -> {after})"
+    )
+
+
+if __name__ == "__main__":
+    main()
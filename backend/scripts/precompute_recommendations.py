@@ -0,0 +1,127 @@
+"""
+Precompute recommendations for every onboarded user.
+
+    python -m backend.scripts.precompute_recommendations --chunk-size 256 --workers 8
+
+The users collection is loaded once into a CandidateIndex. Onboarded users are
+split into chunks; each chunk is scored with one batched matmul in a worker
+process and written to recommendations/{uid} with a generated_at timestamp.
+Only one chunk's results per worker are held in memory at a time.
+/api/match/recommend serves these documents until they go stale.
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.config import RECOMMEND_RADIUS_KM
+from backend.services.candidate_index import CandidateIndex
+from backend.services.firestore import get_firestore
+from backend.services.index_snapshot import get_snapshot_index
+from backend.services.recommend_service import (
+    RECOMMENDATIONS_COLLECTION,
+    recommend_for_users,
+    recommendation_doc,
+)
+
+# Firestore batches accept at most 500 writes.
+BATCH_WRITES = 500
+
+_index: Optional[CandidateIndex] = None
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def load_index() -> CandidateIndex:
+    index = CandidateIndex()
+    index.reload()
+    return index
+
+
+def _init_worker() -> None:
+    # Forked workers inherit the parent's index; spawned ones map the shared
+    # snapshot when there is one, else load their own.
+    global _index
+    if _index is None:
+        _index = get_snapshot_index() or load_index()
+
+
+def _compute_chunk(args: Tuple[List[str], int, float]) -> Dict[str, List[Tuple[str, float]]]:
+    uids, top_k, radius_km = args
+    return recommend_for_users(uids, top_k=top_k, radius_km=radius_km, index=_index)
+
+
+def chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def write_results(db, results: Dict[str, List[Tuple[str, float]]], top_k: int, radius_km: float) -> None:
+    generated_at = now_ms()
+    collection = db.collection(RECOMMENDATIONS_COLLECTION)
+    batch = db.batch()
+    pending = 0
+    for uid, recs in results.items():
+        batch.set(collection.document(uid), recommendation_doc(recs, top_k, radius_km, generated_at))
+        pending += 1
+        if pending == BATCH_WRITES:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+
+
+def main():
+    global _index
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--radius-km", type=float, default=RECOMMEND_RADIUS_KM)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dry-run", action="store_true", help="compute without writing")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    _index = load_index()
+    uids = [uid for uid, record in _index.items() if record.get("onboarding_completed")]
+    load_s = time.perf_counter() - started
+    print(f"Loaded {len(_index)} users ({len(uids)} onboarded) in {load_s:.1f}s")
+
+    db = None if args.dry_run else get_firestore()
+    jobs = ((chunk, args.top_k, args.radius_km) for chunk in chunked(uids, args.chunk_size))
+
+    done = 0
+    started = time.perf_counter()
+    if args.workers <= 1:
+        results_iter = map(_compute_chunk, jobs)
+        pool = None
+    else:
+        method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        pool = mp.get_context(method).Pool(args.workers, initializer=_init_worker)
+        results_iter = pool.imap_unordered(_compute_chunk, jobs)
+
+    try:
+        for results in results_iter:
+            if db is not None:
+                write_results(db, results, args.top_k, args.radius_km)
+            done += len(results)
+            elapsed = time.perf_counter() - started
+            print(f"  {done}/{len(uids)} users  {done / elapsed:.0f} users/sec", end="\r")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0.0
+    print(f"\nPrecomputed {done} users in {elapsed:.1f}s ({rate:.0f} users/sec, workers={args.workers})")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ import firebase_admin
 from firebase_admin import firestore, db, credentials
 
 from backend.services.firestore import get_firestore
+from backend.services.match_fields import derive_match_fields
 from backend.services.rtdb import get_rtdb
 
 
@@ -265,6 +266,7 @@ def create_user():
         },
     }
 
+    data.update(derive_match_fields(data))
     db_fs.collection("users").document(uid).set(data)
 
     # ⭐ presence 랜덤
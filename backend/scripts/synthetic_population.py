@@ -0,0 +1,164 @@
+"""
+Synthetic user population for offline benchmarks.
+
+    python -m backend.scripts.synthetic_population --n 100000
+
+Generates users shaped like the ones onboarding writes (see
+seed_dummy_users.py): locations clustered around a few cities, a realistic
+gender / orientation mix, age preferences around the user's own age, and
+embeddings drawn from a handful of taste clusters. Nothing touches Firestore
+or Spotify; users go into a MemoryFirestore.
+
+Embedding vectors are stored as float32 numpy arrays rather than lists so a
+million users fit in memory; the candidate index reads either.
+"""
+
+import argparse
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.match_fields import derive_match_fields
+from backend.services.memory_store import MemoryFirestore
+
+# (name, lat, lng, spread_km, weight)
+CITIES = [
+    ("seoul", 37.5665, 126.9780, 12.0, 0.45),
+    ("busan", 35.1796, 129.0756, 8.0, 0.12),
+    ("new_york", 40.7128, -74.0060, 10.0, 0.18),
+    ("los_angeles", 34.0522, -118.2437, 18.0, 0.10),
+    ("london", 51.5074, -0.1278, 10.0, 0.10),
+    ("rural", 36.5, 127.8, 120.0, 0.05),
+]
+
+GENDERS = (["man", "woman", "non-binary"], [0.47, 0.47, 0.06])
+
+# Orientation given gender, roughly matching what onboarding sees.
+ORIENTATIONS = {
+    "man": (
+        ["women", "men", "men and women", "women and non-binary people", "all types of genders"],
+        [0.72, 0.08, 0.08, 0.04, 0.08],
+    ),
+    "woman": (
+        ["men", "women", "men and women", "men and non-binary people", "all types of genders"],
+        [0.70, 0.07, 0.10, 0.04, 0.09],
+    ),
+    "non-binary": (
+        ["all types of genders", "men and non-binary people", "women and non-binary people", "men", "women"],
+        [0.45, 0.15, 0.15, 0.12, 0.13],
+    ),
+}
+
+FIRST = ["Alex", "Sam", "Chris", "Jamie", "Taylor", "Jordan", "Casey", "Riley", "Morgan", "Lee"]
+LAST = ["Kim", "Park", "Choi", "Lee", "Han", "Jung", "Song", "Kang", "Shin", "Yoon"]
+
+PLAYLIST = [
+    {"id": f"track{i}", "uri": f"spotify:track:track{i}", "name": f"Track {i}",
+     "artist": f"Artist {i % 17}", "duration_ms": 180000 + 1000 * i,
+     "image": "https://i.scdn.co/image/placeholder", "preview_url": "https://p.scdn.co/mp3-preview/placeholder"}
+    for i in range(40)
+]
+
+KM_PER_DEG = 111.195
+
+
+def _choice(rng: np.random.Generator, options: Tuple[List[str], List[float]], size: int) -> np.ndarray:
+    values, weights = options
+    p = np.asarray(weights, dtype=float)
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=p / p.sum())]
+
+
+def generate_users(
+    n: int,
+    seed: int = 0,
+    dim: int = 384,
+    taste_clusters: int = 32,
+    onboarded_rate: float = 0.95,
+    located_rate: float = 0.97,
+    block_rate: float = 0.02,
+    chunk_size: int = 50000,
+) -> Iterator[Tuple[str, Dict]]:
+    """(uid, document) pairs, generated chunk by chunk to bound peak memory."""
+    rng = np.random.default_rng(seed)
+    weights = np.array([c[4] for c in CITIES])
+    weights /= weights.sum()
+    centers = rng.standard_normal((taste_clusters, dim)).astype(np.float32) if dim else None
+
+    for start in range(0, n, chunk_size):
+        m = min(chunk_size, n - start)
+        city = rng.choice(len(CITIES), size=m, p=weights)
+        spread = np.array([CITIES[c][3] for c in city])
+        lat = np.array([CITIES[c][1] for c in city]) + rng.standard_normal(m) * spread / KM_PER_DEG
+        lng = np.array([CITIES[c][2] for c in city]) + rng.standard_normal(m) * spread / (
+            KM_PER_DEG * np.cos(np.radians(lat))
+        )
+        located = rng.random(m) < located_rate
+        onboarded = rng.random(m) < onboarded_rate
+
+        age = np.clip(np.round(rng.gamma(9.0, 3.2, size=m) + 18), 18, 70).astype(int)
+        has_pref = rng.random(m) < 0.85
+        pref_min = np.maximum(18, age - rng.integers(2, 10, size=m))
+        pref_max = age + rng.integers(2, 12, size=m)
+
+        gender = _choice(rng, GENDERS, m)
+        orientation = np.empty(m, dtype=object)
+        for g in ORIENTATIONS:
+            pick = gender == g
+            orientation[pick] = _choice(rng, ORIENTATIONS[g], int(pick.sum()))
+
+        if centers is not None:
+            taste = rng.integers(0, taste_clusters, size=m)
+            vectors = centers[taste] + 0.8 * rng.standard_normal((m, dim)).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        for i in range(m):
+            uid = f"syn{start + i:07d}"
+            doc = {
+                "id": uid,
+                "first_name": FIRST[(start + i) % len(FIRST)],
+                "last_name": LAST[(start + i) // len(FIRST) % len(LAST)],
+                "age": int(age[i]),
+                "gender": gender[i],
+                "sexual_orientation": orientation[i],
+                "onboarding_completed": bool(onboarded[i]),
+                "playlist": [PLAYLIST[j] for j in rng.choice(len(PLAYLIST), size=4, replace=False)],
+            }
+            if has_pref[i]:
+                doc["age_preference"] = {"min": int(pref_min[i]), "max": int(pref_max[i])}
+            if located[i]:
+                doc["location"] = {"lat": float(lat[i]), "lng": float(lng[i])}
+            if centers is not None:
+                doc["embedding"] = {"vector": vectors[i], "dim": dim}
+            if block_rate and rng.random() < block_rate:
+                others = rng.integers(0, n, size=rng.integers(1, 4))
+                doc["blocked_users"] = [f"syn{o:07d}" for o in others if o != start + i]
+            doc.update(derive_match_fields(doc))
+            yield uid, doc
+
+
+def populate(
+    store: Optional[MemoryFirestore] = None, n: int = 10000, **kwargs
+) -> MemoryFirestore:
+    store = store or MemoryFirestore()
+    # Tracks are shared between users rather than copied per document.
+    store.collection("users").load(generate_users(n, **kwargs))
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = populate(n=args.n, dim=args.dim, seed=args.seed)
+    elapsed = time.perf_counter() - started
+    users = store.collection("users")
+    print(f"Generated {len(users)} users in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+age_index.py - 격자 셀별 나이 정렬 인덱스
+
+셀마다 row를 나이순으로 정렬한 배열을 캐시해 두고, "내가 원하는 나이 범위"를
+셀당 이진 탐색 두 번으로 잘라낸다. 셀 내용이 바뀌면(GeoGrid의 셀 버전이 바뀌면)
+다음 질의 때 그 셀만 다시 정렬한다.
+"""
+
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+from backend.services.geo_index import Cell, GeoGrid
+
+
+class CellAgeIndex:
+    def __init__(self, grid: GeoGrid):
+        self.grid = grid
+        # cell -> (grid version, rows sorted by age, their ages)
+        self._sorted: Dict[Cell, Tuple[int, np.ndarray, np.ndarray]] = {}
+        self.rebuilds = 0
+
+    def _cell(self, cell: Cell, ages: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        version, keys = self.grid.cell_members(cell)
+        cached = self._sorted.get(cell)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        if not keys:
+            self._sorted.pop(cell, None)
+            empty = np.empty(0, dtype=np.int64)
+            return empty, np.empty(0)
+        rows = np.fromiter(keys, dtype=np.int64, count=len(keys))
+        cell_ages = ages[rows]
+        # NaN ages sort last and never fall inside a bisected range.
+        order = np.argsort(cell_ages, kind="stable")
+        rows, cell_ages = rows[order], cell_ages[order]
+        self._sorted[cell] = (version, rows, cell_ages)
+        self.rebuilds += 1
+        return rows, cell_ages
+
+    def rows_in_range(
+        self, cells: Iterable[Cell], ages: np.ndarray, lo: float, hi: float
+    ) -> np.ndarray:
+        """Rows in `cells` with lo <= age <= hi, given the table's age column."""
+        parts = []
+        for cell in cells:
+            rows, cell_ages = self._cell(cell, ages)
+            if rows.size == 0:
+                continue
+            start = np.searchsorted(cell_ages, lo, side="left")
+            stop = np.searchsorted(cell_ages, hi, side="right")
+            if stop > start:
+                parts.append(rows[start:stop])
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(parts)
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached_cells": len(self._sorted), "rebuilds": self.rebuilds}
@@ -1,39 +1,11 @@
-def _normalize_conversation(conversation_obj):
-    if isinstance(conversation_obj, dict) and "conversation" in conversation_obj:
-        return conversation_obj
-    conv = getattr(conversation_obj, "conversation", None)
-    if conv is None:
-        return {"conversation": []}
-    normalized = []
-    for u in conv:
-        if isinstance(u, dict):
-            normalized.append(u)
-        else:
-            normalized.append(
-                {
-                    "speaker": getattr(u, "speaker", None),
-                    "start": getattr(u, "start", None),
-                    "end": getattr(u, "end", None),
-                    "text": getattr(u, "text", ""),
-                }
-            )
-    return {"conversation": normalized}
+from backend.services.analysis.models.schema import ConversationView
 
 
-def analyze(conversation_data):
-    conv = conversation_data["conversation"]
-
-    speakers = {}
-    for u in conv:
-        speakers.setdefault(u["speaker"], []).append(u["text"])
-
-    if len(speakers) < 2:
+def analyze(view: ConversationView):
+    if len(view.speakers) < 2:
         return {"score": 0}
 
-    a, b = list(speakers.values())
-
-    words_a = set(" ".join(a).split())
-    words_b = set(" ".join(b).split())
+    words_a, words_b = (set(view.speaker_tokens(code)) for code in range(len(view.speakers)))
 
     score = int(len(words_a & words_b) / max(len(words_a | words_b), 1) * 100)
     return {"score": score}
@@ -41,8 +13,7 @@ def analyze(conversation_data):
 
 class LSMAnalyzer:
     def score(self, conversation_obj):
-        data = _normalize_conversation(conversation_obj)
-        raw = analyze(data)
+        raw = analyze(ConversationView.of(conversation_obj))
         return {
             "scores": {
                 "lsm": float(raw.get("score", 0)),
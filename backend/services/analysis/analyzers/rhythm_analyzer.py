@@ -1,43 +1,16 @@
 import numpy as np
 from dtaidistance import dtw
 
+from backend.services.analysis.models.schema import ConversationView
 
-def _normalize_conversation(conversation_obj):
-    if isinstance(conversation_obj, dict) and "conversation" in conversation_obj:
-        return conversation_obj
-    conv = getattr(conversation_obj, "conversation", None)
-    if conv is None:
-        return {"conversation": []}
-    normalized = []
-    for u in conv:
-        if isinstance(u, dict):
-            normalized.append(u)
-        else:
-            normalized.append(
-                {
-                    "speaker": getattr(u, "speaker", None),
-                    "start": getattr(u, "start", None),
-                    "end": getattr(u, "end", None),
-                    "text": getattr(u, "text", ""),
-                }
-            )
-    return {"conversation": normalized}
-
-
-def analyze(conversation_data):
-    conv = conversation_data["conversation"]
-
-    response_a, response_b = [], []
-
-    for i in range(1, len(conv)):
-        prev = conv[i - 1]
-        cur = conv[i]
-        rt = max(0, (cur["start"] - prev["end"]) * 1000)
-
-        if cur["speaker"] == conv[0]["speaker"]:
-            response_a.append(rt)
-        else:
-            response_b.append(rt)
+
+def analyze(view: ConversationView):
+    # Gap before each turn, attributed to the turn's speaker (first speaker vs the rest).
+    rt = np.maximum(0, (view.starts[1:] - view.ends[:-1]) * 1000)
+    is_first = view.speaker_codes[1:] == 0
+
+    response_a = rt[is_first]
+    response_b = rt[~is_first]
 
     if len(response_a) < 2 or len(response_b) < 2:
         return {"score": 0}
@@ -50,8 +23,7 @@ def analyze(conversation_data):
 
 class RhythmAnalyzer:
     def score(self, conversation_obj):
-        data = _normalize_conversation(conversation_obj)
-        raw = analyze(data)
+        raw = analyze(ConversationView.of(conversation_obj))
         return {
             "scores": {
                 "rhythm_synchrony": float(raw.get("score", 0)),
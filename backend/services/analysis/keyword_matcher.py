@@ -0,0 +1,123 @@
+"""
+keyword_matcher.py - 키워드 사전 다중 패턴 매처
+
+작은 사전(SCAN_THRESHOLD 개 이하)은 키워드마다 str.find 로 훑는다 (C 속도).
+큰 사전은 한 번 Aho-Corasick 오토마톤을 만들어 두고, 대화 텍스트를 한 번만
+훑으면서 모든 키워드 등장 횟수를 센다. 키워드 수가 늘어도 텍스트를 다시 훑지 않는다.
+
+매칭은 단어 경계를 지킨다: 앞뒤 글자가 단어 문자(영숫자/한글/_)이면 세지
+않는다 ("like" 는 "likely" 에 걸리지 않음). 키워드와 텍스트는 소문자로
+비교하며, 여러 단어 키워드("like you")는 공백까지 그대로 맞춘다.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+# Above this many keywords the single automaton pass beats one str.find scan per
+# keyword (measured on a 140k-char transcript).
+SCAN_THRESHOLD = 100
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(k.lower() for k in keywords if k))
+        self._automaton = len(self.keywords) > SCAN_THRESHOLD
+        if self._automaton:
+            self._build()
+
+    def _build(self):
+        # State 0 is the root. goto[s] maps a character to the next state.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (keyword index, keyword length) for every keyword ending there,
+        # including the ones reached through failure links.
+        self._out: List[Tuple[Tuple[int, int], ...]] = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += ((index, len(keyword)),)
+
+        # Breadth-first so a state's failure target is finished before its children.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while ch not in self._goto[fallback] and fallback:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+        # Full transition table (goto with failure links folded in), so matching is one
+        # dict lookup per character. Characters absent from every keyword go to the root.
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            queue.extend(self._goto[state].values())
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Whole-word occurrences of each keyword in `text`."""
+        text = text.lower()
+        found = self._walk(text) if self._automaton else self._scan(text)
+        return dict(zip(self.keywords, found))
+
+    def _scan(self, text: str) -> List[int]:
+        found = []
+        size = len(text)
+        for keyword in self.keywords:
+            hits = 0
+            pos = text.find(keyword)
+            while pos != -1:
+                end = pos + len(keyword)
+                if (pos == 0 or not _is_word_char(text[pos - 1])) and (
+                    end == size or not _is_word_char(text[end])
+                ):
+                    hits += 1
+                    pos = text.find(keyword, end)
+                else:
+                    pos = text.find(keyword, pos + 1)
+            found.append(hits)
+        return found
+
+    def _walk(self, text: str) -> List[int]:
+        found = [0] * len(self.keywords)
+        # A keyword is not counted again where it overlaps its own previous match
+        # ("a a" in "a a a" is one), the same as the left-to-right scan.
+        last_end = [0] * len(self.keywords)
+        delta, out = self._delta, self._out
+        size = len(text)
+        state = 0
+        for pos, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = pos + 1
+            if end < size and _is_word_char(text[end]):
+                continue
+            for index, length in out[state]:
+                start = end - length
+                if start >= last_end[index] and (start == 0 or not _is_word_char(text[start - 1])):
+                    found[index] += 1
+                    last_end[index] = end
+        return found
+
+    def count(self, text: str) -> int:
+        """Total whole-word keyword occurrences in `text`."""
+        return sum(self.counts(text).values())
@@ -1,9 +1,14 @@
 # backend/services/analysis/conversation_builder.py
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
 import whisper
 import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from backend.config import TRANSCRIBE_WORKERS
 
 # -------------------------
 # Whisper lazy loader
@@ -61,12 +66,83 @@ def audio_to_segments(
     return segments
 
 
+# -------------------------
+# Parallel transcription pool
+# -------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def torch_threads_per_worker(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_transcribe_worker(torch_threads: int) -> None:
+    # Split the cores between workers instead of every worker using all of them.
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(1)
+    get_whisper_model()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    TRANSCRIBE_WORKERS processes, created once and kept across talks whatever
+    their speaker count, so each worker loads Whisper once. Only the
+    (wav path, speaker) pairs are sent per talk.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: torch/OpenMP state is not fork-safe.
+            _pool = ProcessPoolExecutor(
+                max_workers=TRANSCRIBE_WORKERS,
+                mp_context=get_context("spawn"),
+                initializer=_init_transcribe_worker,
+                initargs=(torch_threads_per_worker(TRANSCRIBE_WORKERS),),
+            )
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def transcribe_speakers(
+    speaker_audio_map: Dict[str, str],
+    parallel: bool = TRANSCRIBE_WORKERS > 1,
+) -> List[List[Dict]]:
+    """
+    화자별 segment 리스트 (speaker_audio_map 순서)
+
+    parallel 이고 화자가 둘 이상이면 화자별 작업을 공유 프로세스 풀
+    (TRANSCRIBE_WORKERS 개)에 넣어 동시에 전사한다. 화자 수가 풀 크기와 달라도
+    풀은 그대로 쓴다. 풀이 깨지면 순차 전사로 되돌린다.
+    """
+    items = list(speaker_audio_map.items())
+    if parallel and len(items) > 1:
+        try:
+            pool = _get_pool()
+            futures = [pool.submit(audio_to_segments, wav_path, speaker_id) for speaker_id, wav_path in items]
+            return [f.result() for f in futures]
+        except BrokenProcessPool as e:
+            print(f"⚠️ transcription pool failed, falling back to sequential: {e}")
+            _reset_pool()
+    return [audio_to_segments(wav_path, speaker_id) for speaker_id, wav_path in items]
+
+
 # -------------------------
 # Multiple speakers merge
 # -------------------------
 def build_conversation(
     call_id: str,
     speaker_audio_map: Dict[str, str],
+    parallel: bool = TRANSCRIBE_WORKERS > 1,
 ) -> Dict:
     """
     여러 화자의 wav 파일을 받아
@@ -80,8 +156,8 @@ def build_conversation(
 
     all_segments: List[Dict] = []
 
-    for speaker_id, wav_path in speaker_audio_map.items():
-        segments = audio_to_segments(wav_path, speaker_id)
+    # 화자 순서대로 이어 붙인 뒤 안정 정렬하므로 순차/병렬 결과가 같다
+    for segments in transcribe_speakers(speaker_audio_map, parallel=parallel):
         all_segments.extend(segments)
 
     # 시간 기준 정렬
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
 
 
 @dataclass
@@ -14,3 +16,79 @@ class ConversationTurn:
 class Conversation:
     call_id: str
     conversation: List[ConversationTurn]
+
+
+def _field(turn: Any, name: str, default=None):
+    if isinstance(turn, dict):
+        return turn.get(name, default)
+    return getattr(turn, name, default)
+
+
+def _seconds(value: Any) -> float:
+    return float(value) if value is not None else np.nan
+
+
+class ConversationView:
+    """
+    Read-only, column-oriented view of one conversation shared by the text
+    analyzers. Built once per talk; speakers are int codes in order of first
+    appearance, times are float arrays, and lowercase text/tokens are
+    computed here instead of in every analyzer.
+    """
+
+    __slots__ = ("call_id", "speakers", "speaker_codes", "starts", "ends", "texts", "tokens", "text")
+
+    def __init__(self, call_id: str, turns: List[Any]):
+        speakers: Dict[Any, int] = {}
+        codes: List[int] = []
+        starts: List[float] = []
+        ends: List[float] = []
+        texts: List[str] = []
+        for turn in turns:
+            codes.append(speakers.setdefault(_field(turn, "speaker"), len(speakers)))
+            starts.append(_seconds(_field(turn, "start")))
+            ends.append(_seconds(_field(turn, "end")))
+            texts.append(str(_field(turn, "text", "") or "").lower())
+
+        columns = {
+            "call_id": call_id,
+            "speakers": tuple(speakers),
+            "speaker_codes": np.array(codes, dtype=np.int32),
+            "starts": np.array(starts, dtype=np.float64),
+            "ends": np.array(ends, dtype=np.float64),
+            "texts": tuple(texts),
+            "tokens": tuple(tuple(text.split()) for text in texts),
+            "text": " ".join(texts),
+        }
+        for name, value in columns.items():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("ConversationView is read-only")
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def of(cls, conversation_obj: Any) -> "ConversationView":
+        """Accepts a view, a Conversation, or a {"conversation": [...]} dict."""
+        if isinstance(conversation_obj, cls):
+            return conversation_obj
+        if isinstance(conversation_obj, dict):
+            turns = conversation_obj.get("conversation") or []
+            call_id = conversation_obj.get("call_id")
+        else:
+            turns = getattr(conversation_obj, "conversation", None) or []
+            call_id = getattr(conversation_obj, "call_id", None)
+        return cls(str(call_id or "unknown"), turns)
+
+    def speaker_tokens(self, code: int) -> Tuple[str, ...]:
+        """All tokens spoken by one speaker code, in order."""
+        return tuple(
+            token
+            for turn_code, turn_tokens in zip(self.speaker_codes.tolist(), self.tokens)
+            if turn_code == code
+            for token in turn_tokens
+        )
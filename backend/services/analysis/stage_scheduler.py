@@ -0,0 +1,110 @@
+"""
+stage_scheduler.py - 분석 단계 DAG 스케줄러
+
+단계마다 입력(먼저 끝나야 하는 단계 이름)을 선언하면, 입력이 모두 준비된
+단계부터 스레드 풀에서 동시에 실행한다. 서로 의존하지 않는 단계(텍스트
+분석기, pitch, 대화 임베딩)가 겹쳐 돌므로 전체 시간은 단계 합이 아니라
+가장 긴 의존 경로(critical path)에 가까워진다.
+
+단계 함수는 입력 단계들의 결과를 이름 순서대로 인자로 받는다.
+단계별 wall/CPU 시간은 timings()로 얻는다. CPU 시간은 그 단계를 실행한
+스레드 기준이라 torch/BLAS 내부 스레드의 사용량은 들어가지 않는다.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[..., Any]
+    inputs: Sequence[str] = field(default_factory=tuple)
+
+
+class StageScheduler:
+    def __init__(self, stages: Sequence[Stage], max_workers: int = 4):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate stage name")
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in names]
+            if missing:
+                raise ValueError(f"stage {stage.name} depends on unknown {missing}")
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max(1, max_workers)
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._started = 0.0
+        self._wall_ms = 0.0
+
+    def _call(self, stage: Stage, args: List[Any]) -> Any:
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            return stage.fn(*args)
+        finally:
+            ended = time.perf_counter()
+            with self._lock:
+                self._timings[stage.name] = {
+                    "start_ms": round((started - self._started) * 1000, 1),
+                    "wall_ms": round((ended - started) * 1000, 1),
+                    "cpu_ms": round((time.thread_time() - cpu_started) * 1000, 1),
+                }
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every stage once; returns {stage name: result}. The first stage
+        exception is re-raised after running stages finish; stages not yet
+        started are skipped.
+        """
+        results: Dict[str, Any] = {}
+        pending = dict(self.stages)
+        running: Dict[Future, str] = {}
+        self._timings = {}
+        self._started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis-stage") as pool:
+            try:
+                while pending or running:
+                    for name, stage in list(pending.items()):
+                        if all(dep in results for dep in stage.inputs):
+                            args = [results[dep] for dep in stage.inputs]
+                            running[pool.submit(self._call, stage, args)] = name
+                            del pending[name]
+                    if not running:
+                        raise RuntimeError(f"stage cycle among {sorted(pending)}")
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[running.pop(future)] = future.result()
+            finally:
+                self._wall_ms = (time.perf_counter() - self._started) * 1000
+        return results
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """Longest chain of stage wall times through the declared inputs."""
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def visit(name: str) -> Tuple[float, List[str]]:
+            if name not in best:
+                stage = self.stages[name]
+                own = self._timings.get(name, {}).get("wall_ms", 0.0)
+                longest = max((visit(dep) for dep in stage.inputs), default=(0.0, []))
+                best[name] = (longest[0] + own, longest[1] + [name])
+            return best[name]
+
+        total, path = max((visit(name) for name in self.stages), default=(0.0, []))
+        return path, total
+
+    def timings(self) -> Dict[str, Any]:
+        path, critical_ms = self.critical_path()
+        return {
+            "stages": dict(self._timings),
+            "wall_ms": round(self._wall_ms, 1),
+            "sum_ms": round(sum(t["wall_ms"] for t in self._timings.values()), 1),
+            "critical_path_ms": round(critical_ms, 1),
+            "critical_path": path,
+        }
@@ -0,0 +1,214 @@
+"""
+analysis_queue.py - 대화 분석 작업 큐
+
+/api/match/analyze-talk 는 분석(Storage 다운로드, ffmpeg, Whisper, pyin,
+임베딩, Firestore 쓰기)을 요청 스레드에서 돌리지 않고 여기에 작업으로 넣은 뒤
+바로 응답한다. 작업은 크기가 고정된 스레드 풀에서 실행된다.
+
+- 같은 talk_id 작업이 이미 대기/실행 중이면 새로 만들지 않고 그 작업을 돌려준다.
+- 대기 + 실행 중 작업이 ANALYSIS_MAX_PENDING 이상이면 QueueFull (라우트는 503 +
+  Retry-After) 이라 웹 워커가 분석 때문에 밀리지 않는다.
+- 작업 상태(queued/running/complete/failed)와 대기/실행 시간은 프로세스 메모리에
+  있다. 다른 프로세스가 받은 작업은 talk_history.analysis_status 로 확인한다.
+- 파이프라인이 예외를 던지거나 상태를 남기지 않고 실패로 끝나도 analysis_status 를
+  failed 로 기록해, 폴링하는 쪽이 "running" 에서 멈추지 않는다.
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.config import ANALYSIS_JOB_HISTORY, ANALYSIS_MAX_PENDING, ANALYSIS_WORKERS
+from backend.services.firestore import get_firestore
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETE = "complete"
+FAILED = "failed"
+
+Runner = Callable[[str], Dict[str, Any]]
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _mark_failed(talk_id: str, error: Optional[str], trace: Optional[str] = None) -> None:
+    """Record a failure on talk_history so pollers (talk-end.html) stop waiting."""
+    fields = {
+        "analysis_status": FAILED,
+        "analysis_error": error or "analysis failed",
+        "analysis_failed_at": _now_ms(),
+    }
+    if trace:
+        fields["analysis_trace"] = trace
+    try:
+        get_firestore().collection("talk_history").document(talk_id).update(fields)
+    except Exception as e:
+        print(f"⚠️ could not mark analysis of {talk_id} failed: {e}")
+
+
+def _run_pipeline(talk_id: str) -> Dict[str, Any]:
+    try:
+        # Lazy import to avoid heavy model/ML imports during app startup.
+        from backend.services.analysis_service import analyze_talk_pipeline
+
+        result = analyze_talk_pipeline(talk_id) or {}
+    except Exception as e:
+        _mark_failed(talk_id, f"{type(e).__name__}: {e}", traceback.format_exc())
+        raise
+    if not result.get("success", True):
+        # Some early returns (e.g. no recordings) leave the status at "running".
+        _mark_failed(talk_id, result.get("error") or result.get("message"))
+    return result
+
+
+class AnalysisJob:
+    __slots__ = (
+        "job_id", "talk_id", "status", "submitted_at", "started_at",
+        "finished_at", "message", "error",
+    )
+
+    def __init__(self, talk_id: str):
+        self.job_id = uuid.uuid4().hex
+        self.talk_id = talk_id
+        self.status = QUEUED
+        self.submitted_at = _now_ms()
+        self.started_at: Optional[int] = None
+        self.finished_at: Optional[int] = None
+        self.message: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or _now_ms()
+        queued_until = self.started_at or end
+        return {
+            "job_id": self.job_id,
+            "talk_id": self.talk_id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_ms": queued_until - self.submitted_at,
+            "run_ms": end - self.started_at if self.started_at else None,
+            "message": self.message,
+            "error": self.error,
+        }
+
+
+class AnalysisQueue:
+    def __init__(
+        self,
+        runner: Runner = _run_pipeline,
+        workers: int = ANALYSIS_WORKERS,
+        max_pending: int = ANALYSIS_MAX_PENDING,
+        history: int = ANALYSIS_JOB_HISTORY,
+    ):
+        self._runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="analysis")
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._history = history
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        # talk_id -> job still queued or running
+        self._active: Dict[str, AnalysisJob] = {}
+
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, talk_id: str) -> Tuple[AnalysisJob, bool]:
+        """(job, created). Raises QueueFull when no more work is admitted."""
+        with self._lock:
+            job = self._active.get(talk_id)
+            if job is not None:
+                return job, False
+            if len(self._active) >= self.max_pending:
+                self.rejected += 1
+                raise QueueFull(f"{len(self._active)} analysis jobs pending")
+            job = AnalysisJob(talk_id)
+            self._jobs[job.job_id] = job
+            self._active[talk_id] = job
+            self.submitted += 1
+            self._trim()
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def _run(self, job: AnalysisJob) -> None:
+        job.started_at = _now_ms()
+        job.status = RUNNING
+        try:
+            result = self._runner(job.talk_id) or {}
+            ok = bool(result.get("success", True))
+            job.message = result.get("message") or result.get("status")
+            job.error = result.get("error")
+        except Exception as e:
+            ok = False
+            job.message = "analysis failed"
+            job.error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ analysis job {job.job_id} ({job.talk_id}) failed: {job.error}")
+            traceback.print_exc()
+        job.finished_at = _now_ms()
+        with self._lock:
+            job.status = COMPLETE if ok else FAILED
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            if self._active.get(job.talk_id) is job:
+                del self._active[job.talk_id]
+
+    def _trim(self) -> None:
+        # Forget the oldest finished jobs beyond the history size.
+        excess = len(self._jobs) - self._history - len(self._active)
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status in (COMPLETE, FAILED):
+                del self._jobs[job_id]
+                excess -= 1
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            running = sum(1 for job in self._active.values() if job.status == RUNNING)
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queued": len(self._active) - running,
+                "running": running,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "tracked_jobs": len(self._jobs),
+            }
+
+
+_queue: Optional[AnalysisQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_analysis_queue() -> AnalysisQueue:
+    global _queue
+
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = AnalysisQueue()
+    return _queue
@@ -4,6 +4,7 @@ import os
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
+from backend.config import ANALYSIS_STAGE_WORKERS
 from backend.services.firestore import get_firestore
 from firebase_admin import firestore
 from backend.services.chemistry_model import ChemistryModel
@@ -13,11 +14,13 @@ from backend.services.user_profile_service import update_user_embedding
 from backend.services.analysis.models.schema import (
     Conversation,
     ConversationTurn,
+    ConversationView,
 )
 
 from backend.services.analysis.loaders.storage_loader import StorageLoader
 from backend.services.analysis.loaders.audio_builder import AudioBuilder
 from backend.services.analysis.loaders.conversation_builder import ConversationBuilder
+from backend.services.analysis.stage_scheduler import Stage, StageScheduler
 
 from backend.services.analysis.analyzers.rhythm_analyzer import RhythmAnalyzer
 from backend.services.analysis.analyzers.discourse_analyzer import DiscourseAnalyzer
@@ -345,21 +348,56 @@ class AnalysisService:
                 pass
 
         # 2) Run analyzers
-        try:
-            rhythm_out = self.rhythm.score(conversation_obj)
-            discourse_out = self.discourse.score(conversation_obj)
-            romantic_out = self.romantic.score(conversation_obj)
-            lsm_out = self.lsm.score(conversation_obj)
-            pref_out = self.preference.score(conversation_obj)
-
+        # Text analyzers, pitch (audio) and the conversation embedding (model)
+        # don't depend on each other, so they run concurrently.
+        def _pitch():
             # Pitch analyzer can accept:
             #  - per-speaker wavs (best)
             #  - or list of wav paths (fallback)
-            pitch_out = self.pitch.score(
+            return self.pitch.score(
                 wav_paths_by_speaker=wav_paths_by_speaker if isinstance(wav_paths_by_speaker, dict) else {},
                 wav_paths=wav_paths_all if isinstance(wav_paths_all, list) else [],
                 call_id=talk_id,
             )
+
+        def _embedding():
+            try:
+                return self.embedding.encode_text(_conversation_text(conversation_obj))
+            except Exception:
+                return None
+
+        def _features(rhythm_out, discourse_out, romantic_out, lsm_out, pref_out, pitch_out):
+            return {
+                # keep keys stable (your earlier convention)
+                "turn_taking": float(rhythm_out["scores"].get("rhythm_synchrony", 0)),
+                "flow_continuity": float(discourse_out["scores"].get("topic_continuity", 0)),
+                "romantic_intent": float(romantic_out["scores"].get("romantic_intent", 0)),
+                "language_style_ma": float(lsm_out["scores"].get("lsm", 0)),
+                "preference_sync": float(pref_out["scores"].get("preference_sync", 0)),
+                "voice_pitch": float(pitch_out["scores"].get("voice_pitch", pitch_out["scores"].get("voice pitch", 0))),
+            }
+
+        scheduler = StageScheduler(
+            [
+                # One shared read-only view for the text analyzers.
+                Stage("conversation", lambda: ConversationView.of(conversation_obj)),
+                Stage("rhythm", self.rhythm.score, inputs=("conversation",)),
+                Stage("discourse", self.discourse.score, inputs=("conversation",)),
+                Stage("romantic", self.romantic.score, inputs=("conversation",)),
+                Stage("lsm", self.lsm.score, inputs=("conversation",)),
+                Stage("preference", self.preference.score, inputs=("conversation",)),
+                Stage("pitch", _pitch),
+                Stage("embedding", _embedding),
+                Stage(
+                    "features",
+                    _features,
+                    inputs=("rhythm", "discourse", "romantic", "lsm", "preference", "pitch"),
+                ),
+            ],
+            max_workers=ANALYSIS_STAGE_WORKERS,
+        )
+        try:
+            outputs = scheduler.run()
         except Exception as e:
             try:
                 talk_ref.update(
@@ -369,15 +407,7 @@ class AnalysisService:
                 pass
             return {"success": False, "message": "analyzer failed", "error": str(e), "talk_id": talk_id}
 
-        feats: Dict[str, float] = {
-            # keep keys stable (your earlier convention)
-            "turn_taking": float(rhythm_out["scores"].get("rhythm_synchrony", 0)),
-            "flow_continuity": float(discourse_out["scores"].get("topic_continuity", 0)),
-            "romantic_intent": float(romantic_out["scores"].get("romantic_intent", 0)),
-            "language_style_ma": float(lsm_out["scores"].get("lsm", 0)),
-            "preference_sync": float(pref_out["scores"].get("preference_sync", 0)),
-            "voice_pitch": float(pitch_out["scores"].get("voice_pitch", pitch_out["scores"].get("voice pitch", 0))),
-        }
+        feats: Dict[str, float] = outputs["features"]
 
         # 3) Chemistry score (model can combine + optionally update weights elsewhere)
         try:
@@ -399,25 +429,22 @@ class AnalysisService:
             "features": feats,
             "chemistry_score": chemistry_score,
             "details": {
-                "turn_taking": rhythm_out,
-                "flow_continuity": discourse_out,
-                "romantic_intent": romantic_out,
-                "language_style_ma": lsm_out,
-                "preference_sync": pref_out,
-                "voice_pitch": pitch_out,
+                "turn_taking": outputs["rhythm"],
+                "flow_continuity": outputs["discourse"],
+                "romantic_intent": outputs["romantic"],
+                "language_style_ma": outputs["lsm"],
+                "preference_sync": outputs["preference"],
+                "voice_pitch": outputs["pitch"],
             },
             "model_version": self.model.version(),
             "version": self.model.version(),
             "analyzed_at": _now_ms(),
+            # Per-stage wall/CPU ms, plus the critical path through the stages.
+            "timings": scheduler.timings(),
         }
 
-        # 3.5) Conversation embedding
-        pair_embedding = None
-        try:
-            full_text = _conversation_text(conversation_obj)
-            pair_embedding = self.embedding.encode_text(full_text)
-        except Exception:
-            pair_embedding = None
+        # 3.5) Conversation embedding (computed alongside the analyzers)
+        pair_embedding = outputs["embedding"]
         if pair_embedding:
             analysis["pair_embedding"] = pair_embedding
 
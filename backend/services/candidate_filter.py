@@ -0,0 +1,237 @@
+"""
+candidate_filter.py - /api/users/list, /api/match/recommend 공용 후보 필터
+
+격자 인덱스에서 반경에 걸치는 row만 꺼낸 뒤, 양방향 하드 필터
+(차단, 온보딩, 거리, 성적 지향, 나이 선호)를 NumPy 마스크로 한 번에 적용한다.
+성적 지향은 성별 x 지향 버킷 단위로 판정하므로, 호환되지 않는 버킷은
+거리 계산 전에 통째로 제외된다.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.services.geo_index import EARTH_RADIUS_KM
+from backend.services.orientation import BUCKETS, gender_bit, seek_mask
+from backend.services.user_table import as_number, pref_bound
+
+# Same keys as the filtered_stats dict reported by /api/users/list.
+FILTER_REASONS = (
+    "same_user",
+    "no_onboarding",
+    "no_location",
+    "too_far",
+    "orientation_mismatch",
+    "age_mismatch",
+    "reverse_orientation",
+    "reverse_age",
+    "passed",
+)
+
+# Fields of the querying user's document that filter_candidates reads.
+FILTER_FIELDS = (
+    "location",
+    "gender",
+    "age",
+    "sexual_orientation",
+    "age_preference",
+    "blocked_users",
+)
+
+_BUCKET_GENDER = np.arange(BUCKETS, dtype=np.uint8) >> 3
+_BUCKET_SEEK = np.arange(BUCKETS, dtype=np.uint8) & 7
+
+
+@dataclass
+class Candidates:
+    rows: np.ndarray
+    ids: List[str]
+    distances: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def empty_stats() -> Dict[str, int]:
+    return {reason: 0 for reason in FILTER_REASONS}
+
+
+def haversine_km_np(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs - lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def orientation_luts(my_bit: int, my_mask: int):
+    """Per-bucket (I accept them, they accept me) tables for one querying user."""
+    i_accept = (_BUCKET_GENDER & my_mask) != 0
+    accepts_me = (_BUCKET_SEEK & my_bit) != 0
+    return i_accept, accepts_me
+
+
+def _accepts_age(table, rows: np.ndarray, my_age: float) -> np.ndarray:
+    """Interval-containment mask: which of `rows` accept someone of my_age."""
+    return ~table.has_age_pref[rows] | (
+        (table.age_min[rows] <= my_age) & (my_age <= table.age_max[rows])
+    )
+
+
+def _empty() -> Candidates:
+    return Candidates(rows=np.empty(0, dtype=np.int64), ids=[], distances=np.empty(0))
+
+
+def location_of(me: Dict):
+    """(lat, lng) of a user document, NaN when missing."""
+    loc = me.get("location") or {}
+    if not isinstance(loc, dict):
+        return np.nan, np.nan
+    return as_number(loc.get("lat")), as_number(loc.get("lng"))
+
+
+def is_candidate(me: Dict) -> bool:
+    """
+    Whether `me` passes the checks filter_candidates applies only to the other
+    side (onboarding, location, gender, age). For such users the filters are
+    symmetric: their candidates are exactly the users they are a candidate of.
+    """
+    lat, lng = location_of(me)
+    age = as_number(me.get("age"))
+    return (
+        bool(me.get("onboarding_completed"))
+        and not (np.isnan(lat) or np.isnan(lng))
+        and gender_bit(me.get("gender")) != 0
+        and not np.isnan(age)
+        and age != 0
+    )
+
+
+def spatial_rows(index, me: Dict, radius_km: float) -> np.ndarray:
+    """
+    Spatial prefilter: table rows in the grid cells around `me` (not yet
+    distance-checked). With an age preference, only rows inside it, via the
+    per-cell age-sorted index. Call with index.lock held.
+    """
+    lat, lng = location_of(me)
+    if np.isnan(lat) or np.isnan(lng):
+        return np.empty(0, dtype=np.int64)
+    age_pref = me.get("age_preference") or {}
+    if age_pref:
+        # Per-cell age-sorted rows: my age range is two bisects per cell.
+        return index.ages.rows_in_range(
+            index.grid.neighbor_cells(lat, lng, radius_km),
+            index.table.age,
+            pref_bound(age_pref, "min", 0.0),
+            pref_bound(age_pref, "max", 100.0),
+        )
+    return np.fromiter(index.grid.candidates(lat, lng, radius_km), dtype=np.int64)
+
+
+def filter_candidates(
+    index,
+    uid: str,
+    me: Dict,
+    radius_km: float,
+    stats: Optional[Dict[str, int]] = None,
+    rows: Optional[np.ndarray] = None,
+) -> Candidates:
+    """
+    Users that pass every hard filter in both directions, nearest first.
+
+    If `stats` is given, per-reason rejection counts are added to it (same keys
+    as FILTER_REASONS). Users outside the grid cells around `me` are counted
+    as too_far without further checks.
+
+    `rows` restricts the check to the given table rows (e.g. ANN results, or
+    spatial_rows from an earlier pipeline stage) instead of the grid
+    neighbourhood.
+    """
+    my_lat, my_lng = location_of(me)
+
+    my_age = as_number(me.get("age"))
+    i_accept, accepts_me = orientation_luts(
+        gender_bit(me.get("gender")), seek_mask(me.get("sexual_orientation"))
+    )
+    compatible = i_accept & accepts_me
+    my_age_pref = me.get("age_preference") or {}
+    my_blocked = me.get("blocked_users") or []
+
+    with index.lock:
+        table = index.table
+        total = len(table.row_of)
+
+        if np.isnan(my_lat) or np.isnan(my_lng):
+            if stats is not None:
+                stats["no_location"] += total
+            return _empty()
+
+        if stats is None and not compatible.any():
+            return _empty()
+
+        if rows is not None:
+            rows = rows[table.alive[rows]]
+        elif stats is None:
+            rows = spatial_rows(index, me, radius_km)
+        else:
+            rows = np.fromiter(index.grid.candidates(my_lat, my_lng, radius_km), dtype=np.int64)
+        if stats is not None:
+            stats["too_far"] += total - len(rows)
+        else:
+            # Without per-reason counts, drop incompatible buckets and users whose
+            # age range excludes me before computing any distance.
+            rows = rows[compatible[table.bucket[rows]]]
+            rows = rows[_accepts_age(table, rows, my_age)]
+        n = len(rows)
+        if n == 0:
+            return _empty()
+
+        dist = haversine_km_np(my_lat, my_lng, table.lat[rows], table.lng[rows])
+        age = table.age[rows]
+        g_bit = table.gender_bit[rows]
+        bucket = table.bucket[rows]
+
+        # Blocked in either direction: one membership mask, no per-candidate sets.
+        excluded = set(index.blocks.excluded(uid)).union(my_blocked)
+        blocked = np.isin(rows, [table.row_of[b] for b in excluded if b in table.row_of])
+
+        if my_age_pref:
+            lo = pref_bound(my_age_pref, "min", 0.0)
+            hi = pref_bound(my_age_pref, "max", 100.0)
+            age_ok = (lo <= age) & (age <= hi)
+        else:
+            age_ok = np.ones(n, dtype=bool)
+
+        reverse_age_ok = _accepts_age(table, rows, my_age)
+
+        # Each candidate is counted under the first check that rejects it.
+        checks = (
+            ("too_far", ~(dist <= radius_km)),
+            ("same_user", rows == table.row_of.get(uid, -1)),
+            ("same_user", blocked),
+            ("no_onboarding", ~table.onboarded[rows]),
+            ("no_location", (g_bit == 0) | np.isnan(age) | (age == 0)),
+            ("orientation_mismatch", ~i_accept[bucket]),
+            ("age_mismatch", ~age_ok),
+            ("reverse_orientation", ~accepts_me[bucket]),
+            ("reverse_age", ~reverse_age_ok),
+        )
+
+        keep = np.ones(n, dtype=bool)
+        for reason, rejected in checks:
+            if stats is not None:
+                stats[reason] += int(np.count_nonzero(keep & rejected))
+            keep &= ~rejected
+
+        passed = rows[keep]
+        passed_dist = dist[keep]
+        order = np.argsort(passed_dist, kind="stable")
+        passed = passed[order]
+        passed_dist = passed_dist[order]
+        ids = [table.ids[r] for r in passed]
+
+    if stats is not None:
+        stats["passed"] += len(ids)
+    return Candidates(rows=passed, ids=ids, distances=passed_dist)
@@ -0,0 +1,429 @@
+"""
+candidate_index.py - 추천 후보 인메모리 인덱스
+
+users 컬렉션을 한 번 로드한 뒤 on_snapshot 리스너로 변경분만 반영한다.
+on_snapshot을 지원하지 않는 클라이언트(로컬 테스트용 대체 구현 등)는
+주기적으로 전체를 다시 읽는 polling 방식으로 동작한다.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import (
+    ANN_ENABLED,
+    ANN_LISTS,
+    ANN_PROBES,
+    CANDIDATE_INDEX_POLL_SECONDS,
+    CANDIDATE_INDEX_READY_TIMEOUT,
+    GEO_CELL_KM,
+    NEIGHBOR_LIST_SIZE,
+    RECOMMEND_RADIUS_KM,
+)
+from backend.services.age_index import CellAgeIndex
+from backend.services.ann_index import IVFIndex
+from backend.services.block_index import BlockIndex
+from backend.services.candidate_filter import FILTER_FIELDS, filter_candidates, is_candidate
+from backend.services.embedding_codec import read_vector
+from backend.services.firestore import get_firestore
+from backend.services.geo_index import GeoGrid
+from backend.services.neighbor_lists import NeighborLists
+from backend.services.recommend_cache import invalidate_user
+from backend.services.user_table import UserTable
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _same_vector(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return np.array_equal(a, b)
+
+
+# Everything slim_user reads; full loads project the users collection to these.
+INDEX_FIELDS = ("onboarding_completed",) + FILTER_FIELDS + ("embedding.vector", "embedding.packed")
+
+
+def slim_user(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the fields used by the candidate filters and scoring."""
+    loc = data.get("location") or {}
+    lat = _as_float(loc.get("lat")) if isinstance(loc, dict) else None
+    lng = _as_float(loc.get("lng")) if isinstance(loc, dict) else None
+
+    age_pref = data.get("age_preference")
+
+    return {
+        "onboarding_completed": bool(data.get("onboarding_completed")),
+        "location": {"lat": lat, "lng": lng} if lat is not None and lng is not None else None,
+        "gender": data.get("gender"),
+        "age": data.get("age"),
+        "sexual_orientation": data.get("sexual_orientation"),
+        "age_preference": age_pref if isinstance(age_pref, dict) else {},
+        "blocked_users": list(data.get("blocked_users") or []),
+        # Moved into the table's float32 matrix when the record is stored.
+        "vector": read_vector(data.get("embedding")),
+    }
+
+
+class CandidateIndex:
+    def __init__(
+        self,
+        db=None,
+        poll_interval: float = CANDIDATE_INDEX_POLL_SECONDS,
+        cell_km: float = GEO_CELL_KM,
+        ann_enabled: bool = ANN_ENABLED,
+        neighbor_list_size: int = NEIGHBOR_LIST_SIZE,
+    ):
+        self._db = db
+        self._poll_interval = poll_interval
+        self._cell_km = cell_km
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # uid -> time its filter/scoring inputs last changed (after first load).
+        self._changed_at: Dict[str, float] = {}
+        # Grid cells hold table rows, not uids, so filters can index columns directly.
+        self.table = UserTable()
+        self.grid = GeoGrid(cell_km)
+        self.ages = CellAgeIndex(self.grid)
+        self.blocks = BlockIndex()
+        self._ann_enabled = ann_enabled
+        self.ann: Optional[IVFIndex] = self._new_ann()
+        # Filled lazily by recommend_for_users, kept current by _store/_drop.
+        self.neighbors = NeighborLists(neighbor_list_size, RECOMMEND_RADIUS_KM)
+        self._watch = None
+        self._poll_thread: Optional[threading.Thread] = None
+        self._started = False
+        self._rebuild_started = _now()
+
+        self.mode: Optional[str] = None
+        self.full_loads = 0
+        self.snapshot_events = 0
+        self.last_sync_at: Optional[float] = None
+        self.last_rebuild_ms: Optional[float] = None
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def _collection(self):
+        db = self._db or get_firestore()
+        return db.collection("users")
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        collection = self._collection()
+        on_snapshot = getattr(collection, "on_snapshot", None)
+        if callable(on_snapshot):
+            try:
+                # The first callback delivers every document as ADDED.
+                self._rebuild_started = _now()
+                self._watch = on_snapshot(self._on_snapshot)
+                self.mode = "listener"
+                return
+            except NotImplementedError:
+                pass
+
+        self.mode = "polling"
+        self.reload()
+        self._poll_thread = threading.Thread(
+            target=self._poll_loop, name="candidate-index-poll", daemon=True
+        )
+        self._poll_thread.start()
+
+    def stop(self) -> None:
+        if self._watch is not None:
+            try:
+                self._watch.unsubscribe()
+            except Exception:
+                pass
+            self._watch = None
+        with self._lock:
+            self._started = False
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def ensure_ready(self, timeout: float = CANDIDATE_INDEX_READY_TIMEOUT) -> bool:
+        self.start()
+        return self._ready.wait(timeout)
+
+    def _new_ann(self) -> Optional[IVFIndex]:
+        if not self._ann_enabled:
+            return None
+        return IVFIndex(n_lists=ANN_LISTS, n_probe=ANN_PROBES)
+
+    # -------------------------
+    # Sync
+    # -------------------------
+    def reload(self) -> None:
+        started = _now()
+        collection = self._collection()
+        select = getattr(collection, "select", None)
+        query = select(list(INDEX_FIELDS)) if callable(select) else collection
+        records = {
+            doc.id: slim_user(doc.to_dict() or {})
+            for doc in query.stream()
+        }
+        table = UserTable(capacity=max(len(records), 1024))
+        grid = GeoGrid(self._cell_km)
+        blocks = BlockIndex()
+        for uid, record in records.items():
+            self._place(table, grid, None, blocks, uid, record)
+        with self._lock:
+            changed = [
+                uid
+                for uid in self._records.keys()
+                if self._records.get(uid) != records.get(uid)
+                or not _same_vector(self.table.vector(uid), table.vector(uid))
+            ]
+            self._records = records
+            self.table = table
+            self.grid = grid
+            self.ages = CellAgeIndex(grid)
+            self.blocks = blocks
+            # Retrained lazily on the next ann_index() call.
+            self.ann = self._new_ann()
+            # Rebuilt on demand against the new table.
+            self.neighbors.clear()
+            self.full_loads += 1
+            self.last_sync_at = _now()
+            self.last_rebuild_ms = (self.last_sync_at - started) * 1000
+            self._mark_changed(*changed)
+        self._ready.set()
+
+    def _poll_loop(self) -> None:
+        while self._started:
+            time.sleep(self._poll_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"⚠️ candidate index poll failed: {e}")
+
+    def _on_snapshot(self, _col_snapshot, changes, _read_time) -> None:
+        with self._lock:
+            for change in changes:
+                doc = change.document
+                if change.type.name == "REMOVED":
+                    self._drop(doc.id)
+                else:
+                    self._store(doc.id, slim_user(doc.to_dict() or {}))
+            self.snapshot_events += 1
+            self.last_sync_at = _now()
+            if not self._ready.is_set():
+                self.full_loads += 1
+                self.last_rebuild_ms = (self.last_sync_at - self._rebuild_started) * 1000
+        self._ready.set()
+
+    @staticmethod
+    def _place(
+        table: UserTable,
+        grid: GeoGrid,
+        ann: Optional[IVFIndex],
+        blocks: BlockIndex,
+        uid: str,
+        record: Dict[str, Any],
+    ) -> None:
+        row = table.set_row(uid, record, vector=record.pop("vector", None))
+        blocks.set_blocks(uid, record.get("blocked_users") or [])
+        loc = record.get("location")
+        if loc:
+            grid.insert(row, loc["lat"], loc["lng"])
+        else:
+            grid.remove(row)
+        if ann is not None:
+            if table.has_vector[row]:
+                ann.add(row, table.vectors[row])
+            else:
+                ann.remove(row)
+
+    def _store(self, uid: str, record: Dict[str, Any]) -> None:
+        previous = self._records.get(uid)
+        old_vector = self.table.vector(uid)
+        if old_vector is not None:
+            old_vector = old_vector.copy()
+        self._records[uid] = record
+        self._place(self.table, self.grid, self.ann, self.blocks, uid, record)
+        # Only changes to filter/scoring inputs drop cached recommendations.
+        changed = previous is not None and (
+            previous != record or not _same_vector(old_vector, self.table.vector(uid))
+        )
+        if changed:
+            self._mark_changed(uid)
+        if changed or previous is None:
+            self._update_neighbors(uid)
+
+    def _drop(self, uid: str) -> None:
+        if self._records.pop(uid, None) is not None:
+            self._mark_changed(uid)
+        # Lists that still name uid drop it at lookup (it no longer has a row).
+        self.neighbors.discard(uid)
+        self.blocks.set_blocks(uid, [])
+        row = self.table.drop(uid)
+        if row is not None:
+            self.grid.remove(row)
+            if self.ann is not None:
+                self.ann.remove(row)
+
+    def _update_neighbors(self, uid: str) -> None:
+        """
+        Rescore uid against its current candidates: rebuild uid's own list and
+        offer uid (with its new score) to every candidate's list. Only for users
+        that are candidates themselves (is_candidate): then the filters are
+        symmetric and uid's candidates are exactly the users it is a candidate
+        of. Anyone else gets no list (recommendations take the full pass) and is
+        nobody's candidate, so lists still naming it drop it at lookup.
+        """
+        neighbors = self.neighbors
+        if not neighbors:
+            return
+        table = self.table
+        query = table.vector(uid)
+        if query is None or not is_candidate(self._records[uid]):
+            neighbors.discard(uid)
+            return
+        found = filter_candidates(self, uid, self._records[uid], neighbors.radius_km)
+        rows = found.rows[table.has_vector[found.rows]]
+        scores = table.vectors[rows] @ query
+        best = np.argsort(-scores, kind="stable")[: neighbors.size + 1]
+        neighbors.build(uid, [table.ids[rows[j]] for j in best], scores[best], rows.size)
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            neighbors.offer(table.ids[row], uid, score)
+
+    def _mark_changed(self, *uids: str) -> None:
+        if not uids:
+            return
+        now = _now()
+        for uid in uids:
+            self._changed_at[uid] = now
+        invalidate_user(*uids)
+
+    def upsert(self, uid: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._store(uid, slim_user(data))
+
+    def remove(self, uid: str) -> None:
+        with self._lock:
+            self._drop(uid)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    @property
+    def lock(self) -> threading.RLock:
+        """Hold while reading table/grid so a snapshot event can't interleave."""
+        return self._lock
+
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._records.get(uid)
+
+    def add_block(self, uid: str, other_id: str) -> None:
+        """Apply a block right away, ahead of the snapshot that carries it."""
+        with self._lock:
+            self.blocks.add_block(uid, other_id)
+
+    def is_blocked(self, uid: str, other_id: str) -> bool:
+        with self._lock:
+            return self.blocks.is_blocked(uid, other_id)
+
+    def changed_at(self, uid: str) -> Optional[float]:
+        """When uid's location/profile/blocks/embedding last changed, if seen."""
+        with self._lock:
+            return self._changed_at.get(uid)
+
+    def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            return list(self._records.items())
+
+    def nearby(
+        self, lat: float, lng: float, radius_km: float
+    ) -> List[Tuple[str, Dict[str, Any], float]]:
+        """(uid, record, distance_km) for indexed users within radius_km."""
+        with self._lock:
+            ids = self.table.ids
+            return [
+                (ids[row], self._records[ids[row]], d)
+                for row, d in self.grid.within(lat, lng, radius_km)
+            ]
+
+    def ann_index(self) -> Optional[IVFIndex]:
+        """Trained IVF index over the embedding matrix, or None if disabled/too small."""
+        if self.ann is None:
+            return None
+        with self._lock:
+            table = self.table
+            if self.ann.needs_training(int(np.count_nonzero(table.has_vector))):
+                rows = np.flatnonzero(table.has_vector)
+                self.ann.train(table.vectors[rows], rows)
+            return self.ann if self.ann.trained else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            staleness = None
+            if self.last_sync_at is not None:
+                staleness = round(_now() - self.last_sync_at, 3)
+            return {
+                "mode": self.mode,
+                "ready": self._ready.is_set(),
+                "size": len(self._records),
+                "full_loads": self.full_loads,
+                "snapshot_events": self.snapshot_events,
+                "grid": self.grid.stats(),
+                "ages": self.ages.stats(),
+                "blocks": self.blocks.stats(),
+                "ann": self.ann.stats() if self.ann is not None else None,
+                "neighbors": self.neighbors.stats(),
+                "staleness_s": staleness,
+                "last_rebuild_ms": (
+                    round(self.last_rebuild_ms, 2) if self.last_rebuild_ms is not None else None
+                ),
+            }
+
+
+_index: Optional[CandidateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_candidate_index(wait: bool = True) -> CandidateIndex:
+    """
+    The shared index. With wait=False it is started but returned even if the
+    first load hasn't finished; check `.ready` and fall back (segment_query).
+    """
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CandidateIndex()
+    if not wait:
+        _index.start()
+        return _index
+    if not _index.ensure_ready():
+        # Listener has not delivered its first snapshot yet; load directly.
+        _index.reload()
+    return _index
+
+
+def loaded_candidate_index() -> Optional[CandidateIndex]:
+    """The shared index if this process already has one; never starts a load."""
+    return _index
@@ -0,0 +1,95 @@
+"""
+embedding_codec.py - 사용자 임베딩 저장 형식
+
+users/{uid}.embedding 은 두 형식 중 하나로 저장된다.
+
+- vector: float 리스트 (기존 형식, Firestore double = 값당 8바이트)
+- packed: bytes 필드 하나. 헤더에 형식 버전/코덱/차원을 담고 값은 float16
+  또는 int8(+float32 scale)로 채운다. 384차원 기준 768 / 392 바이트.
+
+쓰기 형식은 EMBEDDING_CODEC 설정으로 고르고(float64 = 기존 리스트),
+읽는 쪽은 read_vector()로 두 형식을 모두 읽는다. 기존 문서는
+scripts/migrate_embedding_codec.py 로 변환한다.
+"""
+
+import struct
+from typing import Any, Dict, Optional
+
+import numpy as np
+from firebase_admin import firestore
+
+from backend.config import EMBEDDING_CODEC
+
+FORMAT_VERSION = 1
+
+# Codec ids stored in the header.
+FLOAT16 = 1
+INT8 = 2
+
+CODECS = {"float16": FLOAT16, "int8": INT8}
+# The list format; not packed.
+LIST_CODEC = "float64"
+
+# version, codec, dim
+_HEADER = struct.Struct("<BBH")
+_SCALE = struct.Struct("<f")
+
+
+def encode_vector(vector, codec: str) -> bytes:
+    arr = np.asarray(vector, dtype=np.float32).ravel()
+    code = CODECS[codec]
+    header = _HEADER.pack(FORMAT_VERSION, code, arr.size)
+    if code == FLOAT16:
+        return header + arr.astype("<f2").tobytes()
+    peak = float(np.max(np.abs(arr))) if arr.size else 0.0
+    scale = peak / 127.0 if peak > 0 else 1.0
+    quantized = np.clip(np.rint(arr / scale), -127, 127).astype(np.int8)
+    return header + _SCALE.pack(scale) + quantized.tobytes()
+
+
+def decode_vector(packed: bytes) -> np.ndarray:
+    """float32 vector from encode_vector output. Raises ValueError if malformed."""
+    if len(packed) < _HEADER.size:
+        raise ValueError("packed embedding too short")
+    version, code, dim = _HEADER.unpack_from(packed)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported embedding format version {version}")
+    body = memoryview(packed)[_HEADER.size:]
+    if code == FLOAT16:
+        return np.frombuffer(body, dtype="<f2", count=dim).astype(np.float32)
+    if code == INT8:
+        (scale,) = _SCALE.unpack_from(body)
+        values = np.frombuffer(body[_SCALE.size:], dtype=np.int8, count=dim)
+        return values.astype(np.float32) * np.float32(scale)
+    raise ValueError(f"unknown embedding codec {code}")
+
+
+def read_vector(embedding: Optional[Dict[str, Any]]) -> Optional[Any]:
+    """
+    The vector stored in an `embedding` map, whichever format it uses:
+    a float32 array for packed data, the stored list otherwise, or None.
+    """
+    if not isinstance(embedding, dict):
+        return None
+    packed = embedding.get("packed")
+    if isinstance(packed, (bytes, bytearray)):
+        try:
+            return decode_vector(bytes(packed))
+        except (ValueError, struct.error):
+            return None
+    return embedding.get("vector")
+
+
+def embedding_fields(vector, codec: str = EMBEDDING_CODEC) -> Dict[str, Any]:
+    """
+    `embedding` map entries for a merge write of `vector` in `codec`. The
+    other format's field is deleted so a document holds only one.
+    """
+    values = np.asarray(vector, dtype=float).ravel()
+    if codec == LIST_CODEC:
+        return {"vector": values.tolist(), "packed": firestore.DELETE_FIELD, "dim": int(values.size)}
+    return {
+        "packed": encode_vector(values, codec),
+        "vector": firestore.DELETE_FIELD,
+        "dim": int(values.size),
+    }
@@ -57,3 +57,9 @@ def get_firestore():
 
     _db = firestore.client()
     return _db
+
+
+def use_firestore(client) -> None:
+    """Replace the client returned by get_firestore() (offline scripts, benchmarks)."""
+    global _db
+    _db = client
@@ -0,0 +1,168 @@
+"""
+geo_index.py - 위치 기반 후보 사전 필터용 격자 인덱스
+
+위/경도를 고정 크기 셀로 나누고, 질의 지점이 속한 셀과 반경 안에 걸치는
+이웃 셀의 사용자만 후보로 꺼낸다. 정확한 haversine 거리는 이 후보에만 계산한다.
+"""
+
+import math
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = EARTH_RADIUS_KM * math.pi / 180.0
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1))
+        * math.cos(math.radians(lat2))
+        * math.sin(dlng / 2) ** 2
+    )
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+class GeoGrid:
+    def __init__(self, cell_km: float = 10.0):
+        if cell_km <= 0:
+            raise ValueError("cell_km must be positive")
+        self.cell_km = float(cell_km)
+        self.step = self.cell_km / KM_PER_DEG_LAT
+        self.n_lat = int(math.ceil(180.0 / self.step))
+        self.n_lng = int(math.ceil(360.0 / self.step))
+        self._lock = threading.RLock()
+        # Keys are whatever the caller uses to identify a point (uid, table row, ...).
+        self._cells: Dict[Cell, Dict[Hashable, Tuple[float, float]]] = {}
+        self._points: Dict[Hashable, Tuple[float, float, Cell]] = {}
+        # Bumped on every insert/remove touching a cell, so per-cell caches can
+        # tell when to rebuild.
+        self._versions: Dict[Cell, int] = {}
+        self._clock = 0
+
+    def cell_of(self, lat: float, lng: float) -> Cell:
+        i = min(int(math.floor((lat + 90.0) / self.step)), self.n_lat - 1)
+        j = int(math.floor((lng + 180.0) / self.step)) % self.n_lng
+        return i, j
+
+    def neighbor_cells(self, lat: float, lng: float, radius_km: float) -> List[Cell]:
+        ci, cj = self.cell_of(lat, lng)
+        angle = radius_km / EARTH_RADIUS_KM
+        di = int(math.ceil(math.degrees(angle) / self.step))
+
+        # Widest longitude span of a spherical cap of the given radius.
+        cos_lat = math.cos(math.radians(lat))
+        ratio = math.sin(angle) / cos_lat if cos_lat > 1e-12 else 2.0
+        if ratio >= 1.0:
+            dj = self.n_lng
+        else:
+            dj = int(math.ceil(math.degrees(math.asin(ratio)) / self.step))
+
+        if 2 * dj + 1 >= self.n_lng:
+            cols = range(self.n_lng)
+        else:
+            cols = [(cj + o) % self.n_lng for o in range(-dj, dj + 1)]
+
+        cells = []
+        for i in range(max(ci - di, 0), min(ci + di, self.n_lat - 1) + 1):
+            for j in cols:
+                cells.append((i, j))
+        return cells
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+    def insert(self, key: Hashable, lat: float, lng: float) -> None:
+        cell = self.cell_of(lat, lng)
+        with self._lock:
+            prev = self._points.get(key)
+            if prev is not None and prev[2] != cell:
+                self._discard(key, prev[2])
+            self._points[key] = (lat, lng, cell)
+            self._cells.setdefault(cell, {})[key] = (lat, lng)
+            self._touch(cell)
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            prev = self._points.pop(key, None)
+            if prev is not None:
+                self._discard(key, prev[2])
+
+    def _discard(self, key: Hashable, cell: Cell) -> None:
+        members = self._cells.get(cell)
+        if members is None:
+            return
+        members.pop(key, None)
+        self._touch(cell)
+        if not members:
+            del self._cells[cell]
+
+    def _touch(self, cell: Cell) -> None:
+        self._clock += 1
+        self._versions[cell] = self._clock
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cells.clear()
+            self._points.clear()
+            self._versions.clear()
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def candidates(self, lat: float, lng: float, radius_km: float) -> List[Hashable]:
+        """Keys in the cells overlapping the search radius (not distance-checked)."""
+        out: List[Hashable] = []
+        with self._lock:
+            for cell in self.neighbor_cells(lat, lng, radius_km):
+                members = self._cells.get(cell)
+                if members:
+                    out.extend(members)
+        return out
+
+    def cell_members(self, cell: Cell) -> Tuple[int, List[Hashable]]:
+        """(version, keys) of one cell; the version changes whenever the cell does."""
+        with self._lock:
+            return self._versions.get(cell, 0), list(self._cells.get(cell, ()))
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[Hashable, float]]:
+        """(key, distance_km) for points within radius_km, exact haversine."""
+        # Latitude difference alone already bounds the distance from below.
+        max_dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        out: List[Tuple[Hashable, float]] = []
+        with self._lock:
+            for cell in self.neighbor_cells(lat, lng, radius_km):
+                members = self._cells.get(cell)
+                if not members:
+                    continue
+                for key, (p_lat, p_lng) in members.items():
+                    if abs(p_lat - lat) > max_dlat:
+                        continue
+                    d = haversine_km(lat, lng, p_lat, p_lng)
+                    if d <= radius_km:
+                        out.append((key, d))
+        return out
+
+    def location_of(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            p = self._points.get(key)
+        return (p[0], p[1]) if p else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._points)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            sizes = [len(m) for m in self._cells.values()]
+        return {
+            "cell_km": self.cell_km,
+            "points": sum(sizes),
+            "cells": len(sizes),
+            "max_cell": max(sizes) if sizes else 0,
+        }
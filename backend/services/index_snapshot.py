@@ -0,0 +1,403 @@
+"""
+index_snapshot.py - 여러 워커 프로세스가 공유하는 후보 인덱스 스냅샷
+
+빌더 프로세스(scripts/build_index_snapshot.py)가 CandidateIndex의 컬럼,
+임베딩 행렬, 격자 셀 배치, 차단 목록을 세대(generation)별 디렉터리에 .npy로
+쓰고, CURRENT 파일을 os.replace로 바꿔 새 세대를 원자적으로 공개한다.
+
+    INDEX_SNAPSHOT_DIR/
+        CURRENT              -> "gen-1718000000000"
+        gen-1718000000000/   meta.json, ids.json, <column>.npy, vectors.npy, ...
+
+추천 워커는 np.load(mmap_mode="r")로 파일을 매핑하므로 임베딩/컬럼은 페이지
+캐시 한 벌을 모든 프로세스가 나눠 쓴다. SnapshotIndex는 불변이라 읽을 때 락이
+없고, 새 세대는 참조 하나를 바꿔 끼우는 것으로 반영된다(이전 세대를 쓰던
+요청은 그대로 끝까지 읽는다). 스냅샷이 없으면 호출자는 프로세스 내
+CandidateIndex로 돌아간다.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backend.config import (
+    INDEX_SNAPSHOT_CHECK_SECONDS,
+    INDEX_SNAPSHOT_DIR,
+    INDEX_SNAPSHOT_KEEP,
+)
+from backend.services.geo_index import Cell, GeoGrid
+from backend.services.orientation import describe_mask, gender_name
+from backend.services.user_table import UserTable
+
+CURRENT = "CURRENT"
+_PREFIX = "gen-"
+
+
+def _cell_codes(grid: GeoGrid, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """Vectorised GeoGrid.cell_of, as i * n_lng + j."""
+    i = np.minimum(np.floor((lat + 90.0) / grid.step).astype(np.int64), grid.n_lat - 1)
+    j = np.floor((lng + 180.0) / grid.step).astype(np.int64) % grid.n_lng
+    return i * grid.n_lng + j
+
+
+def _csr(size: int, pairs: Dict[int, List[int]]):
+    counts = np.zeros(size + 1, dtype=np.int64)
+    for row, others in pairs.items():
+        counts[row + 1] = len(others)
+    start = np.cumsum(counts)
+    flat = np.empty(int(start[-1]), dtype=np.int64)
+    for row, others in pairs.items():
+        flat[start[row]:start[row + 1]] = sorted(others)
+    return start, flat
+
+
+# -------------------------
+# Writer
+# -------------------------
+def write_snapshot(index, directory: str, keep: int = INDEX_SNAPSHOT_KEEP) -> str:
+    """
+    Write `index` as a new generation under `directory` and make it current.
+    Returns the generation name. Older generations beyond `keep` are removed;
+    workers still mapping them keep reading the unlinked files.
+    """
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    name = f"{_PREFIX}{int(time.time() * 1000)}"
+    tmp = root / f".{name}.tmp"
+    tmp.mkdir()
+
+    started = time.time()
+    with index.lock:
+        table = index.table
+        grid = index.grid
+        size = table.size
+
+        for column in UserTable._COLUMNS:
+            np.save(tmp / f"{column}.npy", getattr(table, column)[:size])
+        vectors = table.vectors[:size] if table.vectors is not None else np.zeros((size, 0), np.float32)
+        np.save(tmp / "vectors.npy", vectors)
+
+        # Located rows grouped by grid cell, age-sorted within each cell
+        # (NaN ages last), so range queries are bisects over mapped arrays.
+        rows = np.flatnonzero(
+            table.alive[:size] & ~np.isnan(table.lat[:size]) & ~np.isnan(table.lng[:size])
+        )
+        codes = _cell_codes(grid, table.lat[rows], table.lng[rows])
+        order = np.lexsort((table.age[rows], codes))
+        rows, codes = rows[order], codes[order]
+        cell_codes, first = np.unique(codes, return_index=True)
+        np.save(tmp / "cell_codes.npy", cell_codes)
+        np.save(tmp / "cell_start.npy", np.append(first, rows.size).astype(np.int64))
+        np.save(tmp / "cell_rows.npy", rows)
+        np.save(tmp / "cell_ages.npy", table.age[rows])
+
+        # Blocks in either direction, as table rows per row.
+        excluded: Dict[int, List[int]] = {}
+        for uid, other in index.blocks.pairs():
+            a, b = table.row_of.get(uid), table.row_of.get(other)
+            if a is None or b is None:
+                continue
+            excluded.setdefault(a, []).append(b)
+            excluded.setdefault(b, []).append(a)
+        excluded = {row: list(set(others)) for row, others in excluded.items()}
+        block_start, block_rows = _csr(size, excluded)
+        np.save(tmp / "block_start.npy", block_start)
+        np.save(tmp / "block_rows.npy", block_rows)
+
+        with open(tmp / "ids.json", "w") as f:
+            json.dump(table.ids[:size], f)
+        meta = {
+            "generation": name,
+            "created_at": int(started * 1000),
+            "rows": size,
+            "users": len(table.row_of),
+            "dim": int(vectors.shape[1]),
+            "cell_km": grid.cell_km,
+        }
+
+    meta["write_ms"] = round((time.time() - started) * 1000, 1)
+    with open(tmp / "meta.json", "w") as f:
+        json.dump(meta, f)
+
+    os.rename(tmp, root / name)
+    pointer = root / f".{CURRENT}.tmp"
+    pointer.write_text(name)
+    os.replace(pointer, root / CURRENT)
+
+    generations = sorted(p.name for p in root.iterdir() if p.is_dir() and p.name.startswith(_PREFIX))
+    for old in generations[:-max(keep, 1)]:
+        if old != name:
+            shutil.rmtree(root / old, ignore_errors=True)
+    return name
+
+
+# -------------------------
+# Reader
+# -------------------------
+class SnapshotTable:
+    """Read-only UserTable over memory-mapped columns."""
+
+    def __init__(self, path: Path):
+        for column in UserTable._COLUMNS:
+            setattr(self, column, np.load(path / f"{column}.npy", mmap_mode="r"))
+        self.vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        with open(path / "ids.json") as f:
+            self.ids: List[Optional[str]] = json.load(f)
+        self.row_of: Dict[str, int] = {uid: row for row, uid in enumerate(self.ids) if uid is not None}
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.vectors.shape[1] or None
+
+    def vector(self, uid: str) -> Optional[np.ndarray]:
+        row = self.row_of.get(uid)
+        if row is None or not self.has_vector[row]:
+            return None
+        return self.vectors[row]
+
+
+class SnapshotGrid:
+    """GeoGrid queries over the snapshot's cell-grouped rows."""
+
+    def __init__(self, path: Path, cell_km: float):
+        self._geometry = GeoGrid(cell_km)
+        self.cell_km = cell_km
+        self.codes = np.load(path / "cell_codes.npy", mmap_mode="r")
+        self.start = np.load(path / "cell_start.npy", mmap_mode="r")
+        self.rows = np.load(path / "cell_rows.npy", mmap_mode="r")
+        self.ages = np.load(path / "cell_ages.npy", mmap_mode="r")
+
+    def neighbor_cells(self, lat: float, lng: float, radius_km: float) -> List[Cell]:
+        return self._geometry.neighbor_cells(lat, lng, radius_km)
+
+    def spans(self, cells: Iterable[Cell]):
+        """(start, stop) into rows/ages for each non-empty cell."""
+        n_lng = self._geometry.n_lng
+        wanted = np.array([i * n_lng + j for i, j in cells], dtype=np.int64)
+        pos = np.searchsorted(self.codes, wanted)
+        inside = pos < self.codes.size
+        pos, wanted = pos[inside], wanted[inside]
+        pos = pos[self.codes[pos] == wanted]
+        return [(int(self.start[p]), int(self.start[p + 1])) for p in pos]
+
+    def candidates(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        spans = self.spans(self.neighbor_cells(lat, lng, radius_km))
+        if not spans:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.rows[a:b] for a, b in spans])
+
+    def stats(self) -> Dict[str, float]:
+        sizes = np.diff(self.start)
+        return {
+            "cell_km": self.cell_km,
+            "points": int(self.rows.size),
+            "cells": int(self.codes.size),
+            "max_cell": int(sizes.max()) if sizes.size else 0,
+        }
+
+
+class SnapshotAgeIndex:
+    """CellAgeIndex.rows_in_range over cells that are already age-sorted."""
+
+    def __init__(self, grid: SnapshotGrid):
+        self.grid = grid
+
+    def rows_in_range(self, cells: Iterable[Cell], _ages, lo: float, hi: float) -> np.ndarray:
+        parts = []
+        for a, b in self.grid.spans(cells):
+            cell_ages = self.grid.ages[a:b]
+            start = a + int(np.searchsorted(cell_ages, lo, side="left"))
+            stop = a + int(np.searchsorted(cell_ages, hi, side="right"))
+            if stop > start:
+                parts.append(self.grid.rows[start:stop])
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(parts)
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached_cells": int(self.grid.codes.size), "rebuilds": 0}
+
+
+class SnapshotBlocks:
+    """BlockIndex reads over per-row excluded rows."""
+
+    def __init__(self, path: Path, table: SnapshotTable):
+        self._table = table
+        self.start = np.load(path / "block_start.npy", mmap_mode="r")
+        self.rows = np.load(path / "block_rows.npy", mmap_mode="r")
+
+    def _excluded_rows(self, uid: str) -> np.ndarray:
+        row = self._table.row_of.get(uid)
+        if row is None:
+            return np.empty(0, dtype=np.int64)
+        return self.rows[self.start[row]:self.start[row + 1]]
+
+    def excluded(self, uid: str) -> List[str]:
+        return [self._table.ids[r] for r in self._excluded_rows(uid).tolist()]
+
+    def is_blocked(self, uid: str, other_id: str) -> bool:
+        other = self._table.row_of.get(other_id)
+        if other is None:
+            return False
+        rows = self._excluded_rows(uid)
+        i = int(np.searchsorted(rows, other))
+        return i < rows.size and rows[i] == other
+
+    def stats(self) -> Dict[str, int]:
+        return {"pairs": int(self.rows.size) // 2}
+
+
+class SnapshotIndex:
+    """
+    The read side of CandidateIndex (what filter_candidates and
+    recommend_for_users use) over one immutable snapshot generation.
+    """
+
+    # Immutable, so readers never take a lock.
+    lock = nullcontext()
+    ready = True
+
+    def __init__(self, path: Path):
+        with open(path / "meta.json") as f:
+            self.meta: Dict[str, Any] = json.load(f)
+        self.generation = self.meta["generation"]
+        # Epoch seconds the snapshot's data is from.
+        self.created_at = self.meta["created_at"] / 1000
+        self.table = SnapshotTable(path)
+        self.grid = SnapshotGrid(path, self.meta["cell_km"])
+        self.ages = SnapshotAgeIndex(self.grid)
+        self.blocks = SnapshotBlocks(path, self.table)
+
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        """The slim record for uid, rebuilt from its row."""
+        table = self.table
+        row = table.row_of.get(uid)
+        if row is None:
+            return None
+        lat, lng = float(table.lat[row]), float(table.lng[row])
+        age = float(table.age[row])
+        return {
+            "onboarding_completed": bool(table.onboarded[row]),
+            "location": None if np.isnan(lat) or np.isnan(lng) else {"lat": lat, "lng": lng},
+            "gender": gender_name(int(table.gender_bit[row])),
+            "age": None if np.isnan(age) else age,
+            "sexual_orientation": describe_mask(int(table.seek_mask[row])),
+            "age_preference": (
+                {"min": float(table.age_min[row]), "max": float(table.age_max[row])}
+                if table.has_age_pref[row]
+                else {}
+            ),
+            # Applied through self.blocks.
+            "blocked_users": [],
+        }
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self.table.row_of
+
+    def is_blocked(self, uid: str, other_id: str) -> bool:
+        return self.blocks.is_blocked(uid, other_id)
+
+    def ann_index(self):
+        return None
+
+    def __len__(self) -> int:
+        return len(self.table.row_of)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.meta,
+            "age_s": round(time.time() - self.meta["created_at"] / 1000, 3),
+            "grid": self.grid.stats(),
+            "blocks": self.blocks.stats(),
+        }
+
+
+class SnapshotReader:
+    """
+    Follows CURRENT under a snapshot directory. current() re-checks the pointer
+    at most every `check_seconds` and swaps in a new generation by replacing one
+    reference; a load in progress never blocks other callers.
+    """
+
+    def __init__(self, directory: str, check_seconds: float = INDEX_SNAPSHOT_CHECK_SECONDS):
+        self.root = Path(directory)
+        self.check_seconds = check_seconds
+        self._snapshot: Optional[SnapshotIndex] = None
+        self._checked_at = 0.0
+        self._loading = threading.Lock()
+        self.swaps = 0
+        self.last_error: Optional[str] = None
+
+    def current(self) -> Optional[SnapshotIndex]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_seconds and self._loading.acquire(blocking=False):
+            try:
+                self._checked_at = now
+                self._refresh()
+            finally:
+                self._loading.release()
+        return self._snapshot
+
+    def _refresh(self) -> None:
+        try:
+            name = (self.root / CURRENT).read_text().strip()
+        except FileNotFoundError:
+            self._snapshot = None
+            return
+        except OSError as e:
+            self.last_error = str(e)
+            return
+        if self._snapshot is not None and self._snapshot.generation == name:
+            return
+        try:
+            self._snapshot = SnapshotIndex(self.root / name)
+            self.swaps += 1
+            self.last_error = None
+        except (OSError, ValueError, KeyError) as e:
+            # Keep serving the previous generation (or fall back if none).
+            self.last_error = str(e)
+            print(f"⚠️ index snapshot {name} load failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "directory": str(self.root),
+            "generation": snapshot.generation if snapshot is not None else None,
+            "swaps": self.swaps,
+            "last_error": self.last_error,
+            "snapshot": snapshot.stats() if snapshot is not None else None,
+        }
+
+
+_reader: Optional[SnapshotReader] = None
+_reader_lock = threading.Lock()
+
+
+def get_snapshot_reader() -> Optional[SnapshotReader]:
+    """The process-wide reader, or None when INDEX_SNAPSHOT_DIR is unset."""
+    global _reader
+
+    if not INDEX_SNAPSHOT_DIR:
+        return None
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                _reader = SnapshotReader(INDEX_SNAPSHOT_DIR)
+    return _reader
+
+
+def get_snapshot_index() -> Optional[SnapshotIndex]:
+    """The current mapped snapshot, or None (use get_candidate_index())."""
+    reader = get_snapshot_reader()
+    return reader.current() if reader is not None else None
@@ -0,0 +1,116 @@
+"""
+match_fields.py - 쓰기 시점에 저장하는 매칭용 파생 필드
+
+프로필/위치/온보딩 저장 때 원본 필드에서 한 번만 계산해 users 문서에 함께 쓴다.
+읽는 쪽은 문자열 파싱 없이 이 값으로 Firestore 쿼리(==, in, array_contains)를
+걸 수 있다.
+
+- geo_cell: MATCH_CELL_KM 격자 셀 ("i_j")
+- gender_code: 성별 비트 (orientation.MAN/WOMAN/NON_BINARY, 알 수 없으면 0)
+- orientation_mask: 상대로 원하는 성별 비트의 합
+- age_min / age_max: 나이 선호 범위 (없으면 0 / 100), has_age_pref
+- match_eligible: 온보딩 완료 + 위치 + 성별 + 나이가 모두 있어야 True
+- seek_segment: 나와 양방향으로 맞는 "성별:지향" 세그먼트 목록
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+from backend.config import MATCH_CELL_KM
+from backend.services.geo_index import Cell, GeoGrid
+from backend.services.orientation import ALL_GENDERS, gender_bit, is_compatible, seek_mask
+from backend.services.user_table import as_number, pref_bound
+
+# Raw fields the derived ones are computed from.
+SOURCE_FIELDS = (
+    "onboarding_completed",
+    "location",
+    "gender",
+    "age",
+    "sexual_orientation",
+    "age_preference",
+)
+
+DERIVED_FIELDS = (
+    "geo_cell",
+    "gender_code",
+    "orientation_mask",
+    "has_age_pref",
+    "age_min",
+    "age_max",
+    "match_eligible",
+    "seek_segment",
+)
+
+_GENDER_BITS = (1, 2, 4)
+
+match_grid = GeoGrid(MATCH_CELL_KM)
+
+
+def cell_key(cell: Cell) -> str:
+    return f"{cell[0]}_{cell[1]}"
+
+
+def segment_of(g_bit: int, s_mask: int) -> str:
+    return f"{g_bit}:{s_mask}"
+
+
+def compatible_segments(g_bit: int, s_mask: int) -> List[str]:
+    """Every (gender, orientation) segment that matches this user both ways."""
+    return [
+        segment_of(other_bit, other_mask)
+        for other_bit in _GENDER_BITS
+        for other_mask in range(1, ALL_GENDERS + 1)
+        if is_compatible(g_bit, s_mask, other_bit, other_mask)
+    ]
+
+
+def _location(doc: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    loc = doc.get("location")
+    if not isinstance(loc, dict):
+        return None
+    lat, lng = as_number(loc.get("lat")), as_number(loc.get("lng"))
+    if math.isnan(lat) or math.isnan(lng):
+        return None
+    return {"lat": lat, "lng": lng}
+
+
+def derive_match_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+    loc = _location(doc)
+    g_bit = gender_bit(doc.get("gender"))
+    s_mask = seek_mask(doc.get("sexual_orientation"))
+    age = as_number(doc.get("age"))
+    age_pref = doc.get("age_preference")
+    age_pref = age_pref if isinstance(age_pref, dict) else {}
+
+    eligible = (
+        bool(doc.get("onboarding_completed"))
+        and loc is not None
+        and g_bit != 0
+        and not math.isnan(age)
+        and age != 0
+    )
+    return {
+        "geo_cell": cell_key(match_grid.cell_of(loc["lat"], loc["lng"])) if loc else None,
+        "gender_code": g_bit,
+        "orientation_mask": s_mask,
+        "has_age_pref": bool(age_pref),
+        "age_min": pref_bound(age_pref, "min", 0.0),
+        "age_max": pref_bound(age_pref, "max", 100.0),
+        "match_eligible": eligible,
+        "seek_segment": compatible_segments(g_bit, s_mask) if eligible else [],
+    }
+
+
+def with_match_fields(db, uid: str, update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    `update` plus derived fields for the document as it will be after a
+    merge write of `update`. Reads only the source fields of the current doc,
+    and nothing at all when `update` touches none of them.
+    """
+    if not any(key in SOURCE_FIELDS for key in update):
+        return update
+    snap = db.collection("users").document(uid).get(field_paths=list(SOURCE_FIELDS))
+    merged = dict(snap.to_dict() or {}) if snap.exists else {}
+    merged.update({key: value for key, value in update.items() if key in SOURCE_FIELDS})
+    return {**update, **derive_match_fields(merged)}
@@ -0,0 +1,327 @@
+"""
+memory_store.py - 오프라인 벤치마크/시뮬레이션용 인메모리 Firestore
+
+get_firestore()가 돌려주는 클라이언트 중 이 백엔드가 쓰는 부분만 구현한다:
+collection/document get·set·update·delete, stream, select, where, limit,
+get_all, batch, on_snapshot. use_firestore(MemoryFirestore())로 바꿔 끼우면
+서비스 코드는 그대로 실제 Firestore 대신 이 저장소를 읽고 쓴다.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from google.cloud.firestore_v1.transforms import DELETE_FIELD, ArrayRemove, ArrayUnion
+
+_MISSING = object()
+
+
+def _copy(value: Any) -> Any:
+    # Nested dicts/lists are copied; leaves (including numpy vectors) are shared.
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _get_path(data: Dict[str, Any], path: str) -> Any:
+    value: Any = data
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _apply(current: Any, value: Any) -> Any:
+    if isinstance(value, ArrayUnion):
+        out = list(current) if isinstance(current, list) else []
+        out.extend(v for v in value.values if v not in out)
+        return out
+    if isinstance(value, ArrayRemove):
+        current = current if isinstance(current, list) else []
+        return [v for v in current if v not in value.values]
+    return _copy(value)
+
+
+def _set_path(data: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        child = data.get(part)
+        if not isinstance(child, dict):
+            child = data[part] = {}
+        data = child
+    if value is DELETE_FIELD:
+        data.pop(parts[-1], None)
+    else:
+        data[parts[-1]] = _apply(data.get(parts[-1]), value)
+
+
+def _merge(target: Dict[str, Any], data: Dict[str, Any]) -> None:
+    for key, value in data.items():
+        if value is DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, dict):
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            _merge(target[key], value)
+        else:
+            target[key] = _apply(target.get(key), value)
+
+
+def _project(data: Dict[str, Any], field_paths: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if field_paths is None:
+        return _copy(data)
+    out: Dict[str, Any] = {}
+    for path in field_paths:
+        value = _get_path(data, path)
+        if value is not _MISSING:
+            _set_path(out, path, value)
+    return out
+
+
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "in": lambda a, b: a in b,
+    "not-in": lambda a, b: a not in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+    "array_contains_any": lambda a, b: isinstance(a, list) and any(v in a for v in b),
+}
+
+
+class _ChangeType:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class _Change:
+    def __init__(self, name: str, document: "MemorySnapshot"):
+        self.type = _ChangeType(name)
+        self.document = document
+
+
+class MemorySnapshot:
+    def __init__(self, reference: "MemoryDocument", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return self._data
+
+    def get(self, field_path: str) -> Any:
+        value = _get_path(self._data or {}, field_path)
+        return None if value is _MISSING else value
+
+
+class MemoryDocument:
+    def __init__(self, collection: "MemoryCollection", doc_id: str):
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return f"{self._collection.id}/{self.id}"
+
+    def get(self, field_paths: Optional[Sequence[str]] = None, **_kwargs) -> MemorySnapshot:
+        data = self._collection._docs.get(self.id)
+        self._collection._client.reads += 1
+        return MemorySnapshot(self, None if data is None else _project(data, field_paths))
+
+    def set(self, data: Dict[str, Any], merge: bool = False) -> None:
+        with self._collection._lock:
+            current = self._collection._docs.get(self.id)
+            existed = current is not None
+            if merge and existed:
+                _merge(current, data)
+            else:
+                current = {}
+                _merge(current, data)
+                self._collection._docs[self.id] = current
+        self._collection._notify("MODIFIED" if existed else "ADDED", self)
+
+    def update(self, data: Dict[str, Any]) -> None:
+        with self._collection._lock:
+            current = self._collection._docs.get(self.id)
+            if current is None:
+                raise KeyError(f"No document to update: {self.path}")
+            for path, value in data.items():
+                _set_path(current, path, value)
+        self._collection._notify("MODIFIED", self)
+
+    def delete(self) -> None:
+        with self._collection._lock:
+            existed = self._collection._docs.pop(self.id, None) is not None
+        if existed:
+            self._collection._notify("REMOVED", self)
+
+
+class MemoryQuery:
+    def __init__(
+        self,
+        collection: "MemoryCollection",
+        filters: Sequence = (),
+        field_paths: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ):
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._field_paths = field_paths
+        self._limit = limit
+
+    def _copy_with(self, **changes) -> "MemoryQuery":
+        args = {
+            "filters": self._filters,
+            "field_paths": self._field_paths,
+            "limit": self._limit,
+        }
+        args.update(changes)
+        return MemoryQuery(self._collection, **args)
+
+    def where(self, field_path: str = None, op_string: str = None, value: Any = None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string not in _OPS:
+            raise ValueError(f"Unsupported operator: {op_string}")
+        return self._copy_with(filters=self._filters + ((field_path, op_string, value),))
+
+    def select(self, field_paths: Iterable[str]) -> "MemoryQuery":
+        return self._copy_with(field_paths=list(field_paths))
+
+    def limit(self, count: int) -> "MemoryQuery":
+        return self._copy_with(limit=count)
+
+    def _matches(self, data: Dict[str, Any]) -> bool:
+        for path, op, value in self._filters:
+            field = _get_path(data, path)
+            if field is _MISSING:
+                return False
+            try:
+                if not _OPS[op](field, value):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def stream(self, **_kwargs) -> Iterator[MemorySnapshot]:
+        collection = self._collection
+        with collection._lock:
+            items = list(collection._docs.items())
+        count = 0
+        for doc_id, data in items:
+            if self._limit is not None and count >= self._limit:
+                return
+            if not self._matches(data):
+                continue
+            count += 1
+            collection._client.reads += 1
+            yield MemorySnapshot(collection.document(doc_id), _project(data, self._field_paths))
+
+    def get(self, **kwargs) -> List[MemorySnapshot]:
+        return list(self.stream(**kwargs))
+
+
+class _Watch:
+    def __init__(self, collection: "MemoryCollection", callback):
+        self._collection = collection
+        self._callback = callback
+
+    def unsubscribe(self) -> None:
+        with self._collection._lock:
+            if self._callback in self._collection._listeners:
+                self._collection._listeners.remove(self._callback)
+
+
+class MemoryCollection(MemoryQuery):
+    def __init__(self, client: "MemoryFirestore", collection_id: str):
+        super().__init__(self)
+        self._client = client
+        self.id = collection_id
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._listeners: List[Callable] = []
+
+    def document(self, doc_id: str) -> MemoryDocument:
+        return MemoryDocument(self, doc_id)
+
+    def load(self, items: Iterable) -> None:
+        """
+        Bulk insert (doc_id, data) pairs without copying or notifying listeners.
+        The store takes ownership of the dicts; nested values may be shared.
+        """
+        with self._lock:
+            self._docs.update(items)
+
+    def on_snapshot(self, callback) -> _Watch:
+        """Deliver every document as ADDED, then each later write as it happens."""
+        with self._lock:
+            self._listeners.append(callback)
+            initial = [
+                _Change("ADDED", MemorySnapshot(self.document(doc_id), _copy(data)))
+                for doc_id, data in self._docs.items()
+            ]
+            self._client.reads += len(initial)
+        callback(None, initial, None)
+        return _Watch(self, callback)
+
+    def _notify(self, change_type: str, document: MemoryDocument) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+            if not listeners:
+                return
+            data = self._docs.get(document.id)
+            snapshot = MemorySnapshot(document, None if data is None else _copy(data))
+        for callback in listeners:
+            callback(None, [_Change(change_type, snapshot)], None)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+
+class MemoryBatch:
+    def __init__(self):
+        self._ops: List[Callable[[], None]] = []
+
+    def set(self, reference: MemoryDocument, data: Dict[str, Any], merge: bool = False) -> None:
+        self._ops.append(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference: MemoryDocument, data: Dict[str, Any]) -> None:
+        self._ops.append(lambda: reference.update(data))
+
+    def delete(self, reference: MemoryDocument) -> None:
+        self._ops.append(reference.delete)
+
+    def commit(self) -> None:
+        for op in self._ops:
+            op()
+        self._ops = []
+
+
+class MemoryFirestore:
+    def __init__(self):
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._lock = threading.Lock()
+        # Billable document reads (gets plus documents returned by queries).
+        self.reads = 0
+
+    def collection(self, collection_id: str) -> MemoryCollection:
+        with self._lock:
+            col = self._collections.get(collection_id)
+            if col is None:
+                col = self._collections[collection_id] = MemoryCollection(self, collection_id)
+            return col
+
+    def get_all(
+        self, references: Iterable[MemoryDocument], field_paths: Optional[Sequence[str]] = None, **_kwargs
+    ) -> Iterator[MemorySnapshot]:
+        for ref in references:
+            yield ref.get(field_paths=field_paths)
+
+    def batch(self) -> MemoryBatch:
+        return MemoryBatch()
@@ -0,0 +1,134 @@
+"""
+neighbor_lists.py - 사용자별 top-N 이웃(임베딩 유사도) 목록
+
+추천을 한 번 전체 계산하면 그 사용자의 상위 N명과 점수를 목록으로 남긴다.
+이후 누군가의 임베딩/위치/프로필이 바뀌면 CandidateIndex가 그 사람의 목록만
+다시 만들고, 그 사람을 후보로 두는 사용자들의 목록에는 바뀐 벡터와의 점수 하나씩만
+반영한다. 추천은 목록 조회 + 하드 필터로 끝난다.
+
+목록은 스스로도 후보가 될 수 있는 사용자(candidate_filter.is_candidate: 온보딩,
+위치, 성별, 나이)만 가진다. 그래야 필터가 대칭이라 "내 후보 = 나를 후보로 두는
+사용자"가 성립한다. 나머지는 매번 전체 계산한다.
+
+목록마다 floor를 둔다: 목록 밖의 후보는 모두 floor 이하 점수라는 보장.
+목록에서 밀려나거나 빠진 점수로 floor를 올리기만 하므로, 필터를 통과한 목록
+멤버가 top_k 이상이면(또는 floor가 -inf면) 그 상위 top_k는 전체 계산과 같다.
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class NeighborList:
+    __slots__ = ("ids", "scores", "floor")
+
+    def __init__(self, ids: List[str], scores: np.ndarray, floor: float):
+        self.ids = ids
+        self.scores = scores
+        # Every candidate not listed scores <= floor.
+        self.floor = floor
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class NeighborLists:
+    def __init__(self, size: int, radius_km: float):
+        self.size = size
+        # Lists hold candidates for this radius only.
+        self.radius_km = radius_km
+        self._lists: Dict[str, NeighborList] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.updates = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def usable(self, top_k: int, radius_km: float) -> bool:
+        return self.enabled and top_k <= self.size and radius_km == self.radius_km
+
+    def get(self, uid: str) -> Optional[NeighborList]:
+        with self._lock:
+            return self._lists.get(uid)
+
+    def build(self, uid: str, ids: Sequence[str], scores: np.ndarray, total: int) -> None:
+        """
+        Store uid's list from its best candidates, best first. `ids`/`scores`
+        must cover the top min(total, size + 1) of all `total` candidates.
+        """
+        if not self.enabled:
+            return
+        n = min(len(ids), self.size)
+        floor = float(scores[self.size]) if total > self.size else -math.inf
+        entry = NeighborList(list(ids[:n]), np.asarray(scores[:n], dtype=np.float32), floor)
+        with self._lock:
+            self._lists[uid] = entry
+            self.builds += 1
+
+    def offer(self, uid: str, other: str, score: float) -> None:
+        """`other` is a candidate of uid and now scores `score` against it."""
+        with self._lock:
+            entry = self._lists.get(uid)
+            if entry is None:
+                return
+            self.updates += 1
+            try:
+                pos = entry.ids.index(other)
+            except ValueError:
+                pos = -1
+            if pos >= 0:
+                if score >= entry.floor:
+                    entry.scores[pos] = score
+                    return
+                # Dropped below the floor: out of the list, the floor still holds.
+                del entry.ids[pos]
+                entry.scores = np.delete(entry.scores, pos)
+                return
+            if score <= entry.floor:
+                return
+            entry.ids.append(other)
+            entry.scores = np.append(entry.scores, np.float32(score))
+            if len(entry.ids) > self.size:
+                worst = int(np.argmin(entry.scores))
+                entry.floor = max(entry.floor, float(entry.scores[worst]))
+                del entry.ids[worst]
+                entry.scores = np.delete(entry.scores, worst)
+
+    def count_lookups(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def discard(self, uid: str) -> None:
+        with self._lock:
+            self._lists.pop(uid, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lists.clear()
+
+    def __bool__(self) -> bool:
+        return bool(self._lists)
+
+    def __len__(self) -> int:
+        return len(self._lists)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = sum(len(entry) for entry in self._lists.values())
+            return {
+                "size": self.size,
+                "lists": len(self._lists),
+                "entries": entries,
+                "builds": self.builds,
+                "updates": self.updates,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
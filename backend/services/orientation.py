@@ -0,0 +1,89 @@
+"""
+orientation.py - 성별/성적 지향 비트마스크
+
+성별은 비트 하나, 성적 지향은 "상대로 원하는 성별" 비트의 합으로 한 번만
+파싱해 둔다. 두 사람의 양방향 매칭은 비트 AND 두 번으로 끝난다.
+"""
+
+import re
+from typing import Optional
+
+MAN = 1
+WOMAN = 2
+NON_BINARY = 4
+ALL_GENDERS = MAN | WOMAN | NON_BINARY
+
+# gender_bit (0-7) x seek_mask (0-7)
+BUCKETS = 64
+
+_GENDER_BITS = {
+    "man": MAN,
+    "woman": WOMAN,
+    "non-binary": NON_BINARY,
+}
+
+_ALL_PHRASES = {"everyone", "all", "all genders", "anyone", "all types of genders"}
+
+_WORD_BITS = {
+    "men": MAN,
+    "man": MAN,
+    "women": WOMAN,
+    "woman": WOMAN,
+    "non-binary": NON_BINARY,
+    "nonbinary": NON_BINARY,
+}
+
+_WORD_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+
+def gender_bit(gender: Optional[str]) -> int:
+    if not gender:
+        return 0
+    return _GENDER_BITS.get(str(gender).strip().lower(), 0)
+
+
+def seek_mask(orientation: Optional[str]) -> int:
+    """
+    Genders this orientation is interested in.
+
+    A missing orientation is treated as open to everyone. Matching is on whole
+    words, so "women and non-binary people" does not also match "men".
+    """
+    if not orientation:
+        return ALL_GENDERS
+
+    text = str(orientation).strip().lower()
+    if text in _ALL_PHRASES or "all types" in text:
+        return ALL_GENDERS
+
+    mask = 0
+    for word in _WORD_RE.findall(text):
+        mask |= _WORD_BITS.get(word, 0)
+    return mask
+
+
+def bucket_of(g_bit: int, s_mask: int) -> int:
+    return (g_bit << 3) | s_mask
+
+
+def is_compatible(my_bit: int, my_mask: int, other_bit: int, other_mask: int) -> bool:
+    return bool(my_mask & other_bit) and bool(other_mask & my_bit)
+
+
+_BIT_NAMES = {bit: name for name, bit in _GENDER_BITS.items()}
+
+_MASK_WORDS = ((MAN, "men"), (WOMAN, "women"), (NON_BINARY, "non-binary people"))
+
+
+def gender_name(bit: int) -> Optional[str]:
+    """Inverse of gender_bit for a single known bit."""
+    return _BIT_NAMES.get(bit)
+
+
+def describe_mask(mask: int) -> str:
+    """An orientation phrase that seek_mask parses back to `mask`."""
+    if mask == ALL_GENDERS:
+        return "all types of genders"
+    words = [word for bit, word in _MASK_WORDS if mask & bit]
+    # "none" has no gender words, so it parses to 0 rather than the missing default.
+    return " and ".join(words) if words else "none"
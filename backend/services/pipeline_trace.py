@@ -0,0 +1,126 @@
+"""
+pipeline_trace.py - 추천/목록 파이프라인 단계별 계측
+
+요청 하나의 단계(공간 사전필터 → 하드 필터 → 임베딩 점수 → top-k → 프로필 조회)마다
+들어온/남은 후보 수와 소요 시간을 Trace에 기록한다. 모든 기록은 프로세스 전역
+히스토그램에도 누적되어 /api/debug/pipeline-stages 에서 볼 수 있고,
+?trace=1 (DEBUG 환경만) 응답에는 그 요청의 Trace가 그대로 실린다.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds of the latency buckets, in ms; the last bucket is open-ended.
+MS_BOUNDS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# Upper bounds of the candidate-count buckets.
+COUNT_BOUNDS = (0, 1, 4, 16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+
+class Histogram:
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.n = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.n += 1
+        self.total += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if open-ended/empty)."""
+        if not self.n:
+            return None
+        target = q * self.n
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "n": self.n,
+            "mean": round(self.total / self.n, 3) if self.n else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {label: c for label, c in zip(labels, self.counts) if c},
+        }
+
+
+class _StageStats:
+    def __init__(self):
+        self.ms = Histogram(MS_BOUNDS)
+        self.count_in = Histogram(COUNT_BOUNDS)
+        self.count_out = Histogram(COUNT_BOUNDS)
+
+
+_lock = threading.Lock()
+_stages: Dict[Tuple[str, str], _StageStats] = {}
+
+
+def _record(pipeline: str, stage: Dict[str, Any]) -> None:
+    with _lock:
+        entry = _stages.get((pipeline, stage["stage"]))
+        if entry is None:
+            entry = _stages[(pipeline, stage["stage"])] = _StageStats()
+        entry.ms.add(stage["ms"])
+        if stage["in"] is not None:
+            entry.count_in.add(stage["in"])
+        if stage["out"] is not None:
+            entry.count_out.add(stage["out"])
+
+
+class Trace:
+    """
+    Stages of one pipeline run, in order. Each stage is a dict with
+    stage / in / out / ms; set "out" on the dict yielded by stage().
+    """
+
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.stages: List[Dict[str, Any]] = []
+        self.info: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str, count_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        entry: Dict[str, Any] = {"stage": name, "in": count_in, "out": None}
+        started = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self.stages.append(entry)
+            _record(self.pipeline, entry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pipeline": self.pipeline,
+            **self.info,
+            "total_ms": round(sum(s["ms"] for s in self.stages), 3),
+            "stages": self.stages,
+        }
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """{pipeline: {stage: {ms, in, out histograms}}}, stages in first-seen order."""
+    out: Dict[str, Dict[str, Any]] = {}
+    with _lock:
+        for (pipeline, stage), entry in _stages.items():
+            out.setdefault(pipeline, {})[stage] = {
+                "ms": entry.ms.stats(),
+                "in": entry.count_in.stats(),
+                "out": entry.count_out.stats(),
+            }
+    return out
+
+
+def reset() -> None:
+    with _lock:
+        _stages.clear()
@@ -0,0 +1,195 @@
+"""
+recommend_cache.py - 사용자별 추천 결과 캐시 (TTL + LRU)
+
+항목 수로 메모리를 제한하고, 사용자의 위치/프로필/임베딩/차단 목록이 바뀌면
+그 사용자의 항목과 그 사용자가 결과에 들어 있는 다른 사용자의 항목을 함께 지운다.
+계산 도중 무효화된 결과는 저장하지 않되, 판단은 그 결과의 주인과 결과에 든
+사용자 기준이라 다른 사용자의 쓰기가 캐시 적재를 막지 않는다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from backend.config import RECOMMEND_CACHE_MAX_ENTRIES, RECOMMEND_CACHE_TTL_SECONDS
+
+Results = List[Tuple[str, float]]
+
+# Most recent per-uid invalidations remembered for rejecting racing puts.
+INVALIDATION_HISTORY = 50_000
+
+
+class RecommendCache:
+    def __init__(
+        self,
+        max_entries: int = RECOMMEND_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = RECOMMEND_CACHE_TTL_SECONDS,
+        invalidation_history: int = INVALIDATION_HISTORY,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # uid -> (expires_at, params, results)
+        self._entries: "OrderedDict[str, Tuple[float, Hashable, Results]]" = OrderedDict()
+        # recommended uid -> owners whose cached results contain it
+        self._listed_in: Dict[str, Set[str]] = {}
+
+        # Bumped on every invalidation. A put passes the value it read before computing,
+        # and is dropped only if its own uid or a listed uid was invalidated since.
+        self.generation = 0
+        # uid -> (generation, wall time) of its latest invalidation, oldest first. Bounded:
+        # what falls off is folded into the _forgotten_* marks, which reject conservatively.
+        self._invalidated: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._history = max(invalidation_history, 1)
+        self._forgotten_generation = 0
+        self._forgotten_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    def get(self, uid: str, params: Hashable = None) -> Optional[Results]:
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, cached_params, results = entry
+            if expires_at <= time.monotonic():
+                self._remove(uid)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if cached_params != params:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(uid)
+            self.hits += 1
+            return list(results)
+
+    def put(
+        self,
+        uid: str,
+        results: Results,
+        params: Hashable = None,
+        generation: Optional[int] = None,
+        as_of: Optional[float] = None,
+    ) -> None:
+        """
+        Store results for uid. Pass the `generation` read before computing them
+        so results that raced with an invalidation of uid or of a listed user are
+        dropped instead of cached. `as_of` (epoch seconds) is the age of the data
+        they were computed from, e.g. a snapshot's; results older than the latest
+        invalidation of those users are not stored either.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if not self._fresh([uid] + [other_id for other_id, _ in results], generation, as_of):
+                self.stale_puts += 1
+                return
+            self._remove(uid)
+            self._entries[uid] = (time.monotonic() + self.ttl_seconds, params, list(results))
+            for other_id, _ in results:
+                self._listed_in.setdefault(other_id, set()).add(uid)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, *uids: str) -> int:
+        """Drop entries owned by, or listing, any of the given users."""
+        removed = 0
+        with self._lock:
+            for uid in uids:
+                if not uid:
+                    continue
+                owners = {uid} | self._listed_in.pop(uid, set())
+                for owner in owners:
+                    if self._remove(owner):
+                        removed += 1
+            self.generation += 1
+            now = time.time()
+            for uid in uids:
+                if uid:
+                    self._invalidated[uid] = (self.generation, now)
+                    self._invalidated.move_to_end(uid)
+            while len(self._invalidated) > self._history:
+                _, forgotten = self._invalidated.popitem(last=False)
+                self._forgotten_generation, self._forgotten_at = forgotten
+            self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._listed_in.clear()
+            self._invalidated.clear()
+            self.generation += 1
+            self._forgotten_generation = self.generation
+            self._forgotten_at = time.time()
+
+    def _fresh(self, uids: List[str], generation: Optional[int], as_of: Optional[float]) -> bool:
+        if generation is not None and generation < self._forgotten_generation:
+            return False
+        if as_of is not None and as_of < self._forgotten_at:
+            return False
+        for uid in uids:
+            seen = self._invalidated.get(uid)
+            if seen is None:
+                continue
+            if generation is not None and seen[0] > generation:
+                return False
+            if as_of is not None and seen[1] > as_of:
+                return False
+        return True
+
+    def _remove(self, uid: str) -> bool:
+        entry = self._entries.pop(uid, None)
+        if entry is None:
+            return False
+        for other_id, _ in entry[2]:
+            owners = self._listed_in.get(other_id)
+            if owners is not None:
+                owners.discard(uid)
+                if not owners:
+                    del self._listed_in[other_id]
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+            }
+
+
+_cache: Optional[RecommendCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_recommend_cache() -> RecommendCache:
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RecommendCache()
+    return _cache
+
+
+def invalidate_user(*uids: str) -> int:
+    return get_recommend_cache().invalidate(*uids)
@@ -1,159 +1,334 @@
-from typing import Dict, List, Tuple
-import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import random
+import time
 
 import numpy as np
 
+from backend.config import (
+    ANN_CANDIDATES,
+    RECOMMEND_PRECOMPUTED_MAX_AGE_SECONDS,
+    RECOMMEND_RADIUS_KM,
+)
+from backend.services.block_index import fetch_blocks
+from backend.services.candidate_filter import filter_candidates, is_candidate, spatial_rows
+from backend.services.candidate_index import get_candidate_index
 from backend.services.firestore import get_firestore
+from backend.services.index_snapshot import SnapshotIndex, get_snapshot_index
+from backend.services.pipeline_trace import Trace
+from backend.services.recommend_cache import get_recommend_cache
+from backend.services.segment_query import segment_index
+
+RECOMMENDATIONS_COLLECTION = "recommendations"
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(scores.size)
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+def _random_pick(candidates: List[str]) -> List[Tuple[str, float]]:
+    candidates = list(candidates)
+    random.shuffle(candidates)
+    return [(uid, 0.0) for uid in candidates[: min(5, len(candidates))]]
+
+
+def _recommend_ann(index, ann, uid: str, top_k: int, radius_km: float):
+    """
+    Top-N similar users from the ANN index, then the hard filters.
+    Returns None when too few survive, so the caller falls back to the exact path.
+    """
+    table = index.table
+    query = table.vector(uid)
+    if query is None:
+        return None
+    rows, _ = ann.search(table.vectors, query, ANN_CANDIDATES)
+    found = filter_candidates(index, uid, index.get(uid) or {}, radius_km, rows=rows)
+    rows = found.rows[table.has_vector[found.rows]]
+    if rows.size < top_k:
+        return None
+    scores = table.vectors[rows] @ query
+    return [(table.ids[rows[j]], float(scores[j])) for j in _top_k(scores, top_k)]
+
+
+def _recommend_neighbors(index, neighbors, uid: str, top_k: int, radius_km: float):
+    """
+    Top-k from uid's neighbour list after the hard filters, rescored against
+    the current vectors. None when there is no list, uid is not a candidate
+    itself (lists are only kept current for those), or too few listed users
+    survive to be sure nobody outside the list ranks higher.
+    """
+    table = index.table
+    query = table.vector(uid)
+    entry = neighbors.get(uid)
+    me = index.get(uid) or {}
+    if query is None or entry is None or not is_candidate(me):
+        return None
+    rows = np.array([table.row_of[o] for o in entry.ids if o in table.row_of], dtype=np.int64)
+    found = filter_candidates(index, uid, me, radius_km, rows=rows)
+    rows = found.rows[table.has_vector[found.rows]]
+    if rows.size < top_k and entry.floor > -np.inf:
+        return None
+    scores = table.vectors[rows] @ query
+    return [(table.ids[rows[j]], float(scores[j])) for j in _top_k(scores, top_k)]
+
+
+def recommend_for_users(
+    uids: Iterable[str],
+    top_k: int = 10,
+    radius_km: float = RECOMMEND_RADIUS_KM,
+    index=None,
+    trace: Optional[Trace] = None,
+) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Recommendations for several users at once.
+
+    Stages: spatial prefilter -> hard filters -> embedding scoring -> top-k,
+    each timed into `trace` (and the pipeline_trace histograms). Every querying
+    user's candidates are scored in a single matmul against the index's
+    normalized float32 embedding matrix. Users with a usable neighbour list
+    (neighbor_lists) only re-filter that list; the full pass stores one for
+    next time. With the ANN index enabled, users whose ANN shortlist leaves at
+    least top_k survivors skip the full pass as well.
+    """
+    uids = [uid for uid in uids if uid]
+    index = index or get_candidate_index()
+    trace = trace or Trace("recommend_batch")
+    results: Dict[str, List[Tuple[str, float]]] = {}
+
+    with index.lock:
+        table = index.table
+
+        neighbors = getattr(index, "neighbors", None)
+        if neighbors is not None and neighbors.usable(top_k, radius_km):
+            with trace.stage("neighbors", len(uids)) as stage:
+                for uid in uids:
+                    hit = _recommend_neighbors(index, neighbors, uid, top_k, radius_km)
+                    if hit is not None:
+                        results[uid] = hit
+                stage["out"] = len(results)
+            neighbors.count_lookups(hits=len(results), misses=len(uids) - len(results))
+            uids = [uid for uid in uids if uid not in results]
+        else:
+            neighbors = None
+
+        ann = index.ann_index()
+        if ann is not None and uids:
+            with trace.stage("ann", len(uids)) as stage:
+                for uid in uids:
+                    hit = _recommend_ann(index, ann, uid, top_k, radius_km)
+                    if hit is not None:
+                        results[uid] = hit
+                stage["out"] = sum(uid in results for uid in uids)
+            uids = [uid for uid in uids if uid not in results]
+
+        records = {uid: index.get(uid) or {} for uid in uids}
+        with trace.stage("spatial", len(uids)) as stage:
+            near = {uid: spatial_rows(index, records[uid], radius_km) for uid in uids}
+            stage["out"] = sum(rows.size for rows in near.values())
+
+        with trace.stage("filter", stage["out"]) as stage:
+            found = {
+                uid: filter_candidates(index, uid, records[uid], radius_km, rows=near[uid])
+                for uid in uids
+            }
+            stage["out"] = sum(len(f) for f in found.values())
+
+        with trace.stage("score", stage["out"]) as stage:
+            scored: Dict[str, np.ndarray] = {}
+            for uid in uids:
+                rows = found[uid].rows
+                if table.vector(uid) is not None and rows.size:
+                    rows = rows[table.has_vector[rows]]
+                    if rows.size:
+                        scored[uid] = rows
+            if scored:
+                queries = list(scored)
+                q = table.vectors[[table.row_of[uid] for uid in queries]]
+                cols = np.unique(np.concatenate(list(scored.values())))
+                sims = q @ table.vectors[cols].T
+            stage["out"] = sum(rows.size for rows in scored.values())
+
+        with trace.stage("top_k", stage["out"]) as stage:
+            for i, uid in enumerate(scored):
+                rows = scored[uid]
+                scores = sims[i, np.searchsorted(cols, rows)]
+                if neighbors is not None and is_candidate(records[uid]):
+                    best = _top_k(scores, neighbors.size + 1)
+                    neighbors.build(
+                        uid, [table.ids[rows[j]] for j in best], scores[best], rows.size
+                    )
+                    best = best[:top_k]
+                else:
+                    best = _top_k(scores, top_k)
+                results[uid] = [
+                    (table.ids[rows[j]], float(scores[j])) for j in best
+                ]
+            # No embedding on either side: a random sample of the survivors.
+            for uid in uids:
+                if uid not in results:
+                    results[uid] = _random_pick(found[uid].ids)
+            stage["out"] = sum(len(results[uid]) for uid in uids)
+    return results
+
+
+def recommendation_doc(
+    results: List[Tuple[str, float]], top_k: int, radius_km: float, generated_at: int
+) -> Dict[str, Any]:
+    """Document stored at recommendations/{uid}."""
+    return {
+        "users": [{"id": uid, "score": score} for uid, score in results],
+        "top_k": top_k,
+        "radius_km": radius_km,
+        "generated_at": generated_at,
+    }
 
 
-def _get_db():
-    return get_firestore()
-
-
-def _cosine(a: List[float], b: List[float]) -> float:
-    if not a or not b:
-        return 0.0
-    va = np.array(a, dtype=float)
-    vb = np.array(b, dtype=float)
-    if va.size == 0 or vb.size == 0 or va.size != vb.size:
-        return 0.0
-    denom = (np.linalg.norm(va) * np.linalg.norm(vb))
-    if denom == 0:
-        return 0.0
-    return float(np.dot(va, vb) / denom)
-
-def _distance_km(lat1, lng1, lat2, lng2) -> float:
-    r = 6371.0
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = (
-        math.sin(dlat / 2) ** 2
-        + math.cos(math.radians(lat1))
-        * math.cos(math.radians(lat2))
-        * math.sin(dlng / 2) ** 2
-    )
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return r * c
-
-
-def _matches_orientation(orientation, target_gender) -> bool:
-    if not orientation or not target_gender:
-        return False
-
-    orientation = str(orientation).lower()
-    target_gender = str(target_gender).lower()
-
-    if orientation in ["everyone", "all", "all genders", "anyone", "all types of genders"]:
-        return target_gender in ["man", "woman", "non-binary"]
-
-    if "men and women" in orientation:
-        return target_gender in ["man", "woman"]
-
-    if orientation == "men" or "men only" in orientation:
-        return target_gender == "man"
-
-    if orientation == "women" or "women only" in orientation:
-        return target_gender == "woman"
-
-    if "non-binary" == orientation or "non-binary only" in orientation:
-        return target_gender == "non-binary"
-
-    if "men and non-binary" in orientation:
-        return target_gender in ["man", "non-binary"]
-
-    if "women and non-binary" in orientation:
-        return target_gender in ["woman", "non-binary"]
-
-    return False
-
-
-def recommend_for_user(uid: str, top_k: int = 10) -> List[Tuple[str, float]]:
+def load_precomputed(
+    uid: str, top_k: int = 10, radius_km: float = RECOMMEND_RADIUS_KM
+) -> Optional[List[Tuple[str, float]]]:
+    """
+    Results from recommendations/{uid}, or None when missing or stale.
+
+    A document is stale once it is older than RECOMMEND_PRECOMPUTED_MAX_AGE_SECONDS,
+    was generated with different parameters, or the user or anyone it lists has
+    changed location/profile/blocks/embedding since it was generated. Until the
+    candidate index has loaded, changes can't be checked and this returns None.
+
+    The index only sees changes made after this process loaded it, so the listed
+    users are also re-run through the hard filters (blocks, radius, orientation,
+    age) against the current index. Those that fail are dropped; if that leaves
+    a full document short, someone unlisted may now belong in it, and this
+    returns None.
+    """
+    index = get_candidate_index(wait=False)
+    if not index.ready:
+        # Change times are unknown until the first load; the caller's cold path
+        # (segment_query) answers instead of waiting for the index.
+        return None
+    snap = get_firestore().collection(RECOMMENDATIONS_COLLECTION).document(uid).get()
+    if not snap.exists:
+        return None
+    data = snap.to_dict() or {}
+    if data.get("top_k") != top_k or data.get("radius_km") != radius_km:
+        return None
+    generated_at = (data.get("generated_at") or 0) / 1000
+    if time.time() - generated_at > RECOMMEND_PRECOMPUTED_MAX_AGE_SECONDS:
+        return None
+
+    results = [
+        (u["id"], float(u.get("score") or 0.0))
+        for u in data.get("users") or []
+        if isinstance(u, dict) and u.get("id")
+    ]
+    for other_id in [uid] + [other_id for other_id, _ in results]:
+        changed_at = index.changed_at(other_id)
+        if changed_at is not None and changed_at >= generated_at:
+            return None
+
+    me = index.get(uid)
+    if me is None:
+        return None
+    with index.lock:
+        table = index.table
+        rows = np.array([table.row_of[o] for o, _ in results if o in table.row_of], dtype=np.int64)
+    passed = set(filter_candidates(index, uid, me, radius_km, rows=rows).ids)
+    kept = [r for r in results if r[0] in passed]
+    if len(kept) < len(results) and len(results) >= top_k:
+        return None
+    return kept
+
+
+def candidate_source(db, uid: str, radius_km: float, trace: Trace, me: Optional[Dict] = None):
+    """
+    The index a request reads candidates from; trace.info["source"] says which.
+
+    A published snapshot (index_snapshot) is used when it has what the request
+    needs: uid itself, or only `me` (the caller's own document) for listing.
+    With a snapshot published, this process never starts its own
+    CandidateIndex; users newer than the snapshot get a segment query. Without
+    one, the process index is used once loaded, and a segment query until then.
+
+    Snapshots can predate recent blocks; callers apply fetch_blocks() to them.
+    """
+    snapshot = get_snapshot_index()
+    if snapshot is not None and (me is not None or uid in snapshot):
+        trace.info["source"] = "snapshot"
+        return snapshot
+    if snapshot is None:
+        index = get_candidate_index(wait=False)
+        trace.info["source"] = "index"
+        if index.ready:
+            return index
+    # Cold start: read only nearby compatible users instead of waiting for (or
+    # forcing) a full load of the users collection.
+    with trace.stage("segment_query") as stage:
+        index = segment_index(db, uid, radius_km, me=me)
+        stage["out"] = len(index)
+    trace.info["source"] = "segment_query"
+    return index
+
+
+def recommend_for_user(
+    uid: str,
+    top_k: int = 10,
+    radius_km: float = RECOMMEND_RADIUS_KM,
+    use_precomputed: bool = False,
+    trace: Optional[Trace] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Cached per uid. Entries are dropped by the candidate index whenever this
+    user's (or a listed user's) location, profile, embedding or blocks change.
+
+    With `use_precomputed`, a cache miss first tries the batch job's
+    recommendations/{uid} document before computing on demand. Only without a
+    published snapshot: validating it needs this process's own index.
+
+    Candidates come from candidate_source(). Results computed from a snapshot
+    drop users blocked since (either direction), and aren't cached if uid or a
+    listed user was invalidated after the snapshot was taken.
+
+    Every lookup and stage is timed into `trace`; trace.info["source"] says
+    where the results came from.
+    """
     if not uid:
         return []
-
-    db = _get_db()
-    users: Dict[str, Dict] = {
-        d.id: (d.to_dict() or {}) for d in db.collection("users").stream()
-    }
-
-    me = users.get(uid) or {}
-    my_vec = (me.get("embedding") or {}).get("vector")
-
-    my_blocked = set(me.get("blocked_users") or [])
-    my_loc = me.get("location") or {}
-    my_gender = me.get("gender")
-    my_age = me.get("age")
-    my_orientation = me.get("sexual_orientation")
-    my_age_pref = me.get("age_preference", {})
-
-    scores: List[Tuple[str, float]] = []
-    candidates: List[str] = []
-
-    for other_id, user in users.items():
-        if other_id == uid:
-            continue
-
-        other_blocked = set(user.get("blocked_users") or [])
-        if other_id in my_blocked or uid in other_blocked:
-            continue
-
-        if not user.get("onboarding_completed"):
-            continue
-
-        other_loc = user.get("location") or {}
-        if not my_loc or not other_loc:
-            continue
-
-        try:
-            d = _distance_km(
-                float(my_loc.get("lat")),
-                float(my_loc.get("lng")),
-                float(other_loc.get("lat")),
-                float(other_loc.get("lng")),
-            )
-        except Exception:
-            continue
-        if d > 10:
-            continue
-
-        other_gender = user.get("gender")
-        other_age = user.get("age")
-        other_orientation = user.get("sexual_orientation")
-        other_age_pref = user.get("age_preference", {})
-
-        if not other_gender or other_age is None:
-            continue
-
-        if not _matches_orientation(my_orientation, other_gender):
-            continue
-
-        if my_age_pref:
-            if not (my_age_pref.get("min", 0) <= other_age <= my_age_pref.get("max", 100)):
-                continue
-
-        if not _matches_orientation(other_orientation, my_gender):
-            continue
-
-        if other_age_pref:
-            if not (other_age_pref.get("min", 0) <= my_age <= other_age_pref.get("max", 100)):
-                continue
-
-        candidates.append(other_id)
-
-        other_vec = (user.get("embedding") or {}).get("vector")
-        if not other_vec:
-            continue
-
-        s = _cosine(my_vec, other_vec)
-        scores.append((other_id, s))
-
-    if not my_vec:
-        random.shuffle(candidates)
-        return [(uid, 0.0) for uid in candidates[: min(5, len(candidates))]]
-
-    scores.sort(key=lambda x: -x[1])
-    if not scores:
-        random.shuffle(candidates)
-        return [(uid, 0.0) for uid in candidates[: min(5, len(candidates))]]
-    return scores[:top_k]
+    trace = trace or Trace("recommend")
+    cache = get_recommend_cache()
+    params = (top_k, radius_km)
+    generation = cache.generation
+    with trace.stage("cache") as stage:
+        cached = cache.get(uid, params)
+        stage["out"] = len(cached) if cached is not None else 0
+    if cached is not None:
+        trace.info["source"] = "cache"
+        return cached
+
+    db = get_firestore()
+    results = None
+    if use_precomputed and get_snapshot_index() is None:
+        with trace.stage("precomputed") as stage:
+            results = load_precomputed(uid, top_k=top_k, radius_km=radius_km)
+            stage["out"] = len(results) if results is not None else 0
+        trace.info["source"] = "precomputed"
+    as_of = None
+    if results is None:
+        index = candidate_source(db, uid, radius_km, trace)
+        blocked = set()
+        if isinstance(index, SnapshotIndex):
+            as_of = index.created_at
+            with trace.stage("blocks") as stage:
+                blocked = fetch_blocks(db, uid)
+                stage["out"] = len(blocked)
+        results = recommend_for_users(
+            [uid], top_k=top_k + len(blocked), radius_km=radius_km, index=index, trace=trace
+        )[uid]
+        if blocked:
+            results = [r for r in results if r[0] not in blocked][:top_k]
+    cache.put(uid, results, params, generation=generation, as_of=as_of)
+    return results
@@ -0,0 +1,87 @@
+"""
+segment_query.py - 세그먼트 키 기반 Firestore 후보 조회
+
+공유 CandidateIndex가 아직 첫 로드를 마치지 못했을 때(콜드 스타트) users 전체를
+읽는 대신, 쓰기 시점 파생 필드로 주변 + 양방향 호환 사용자만 조회한다.
+
+    users.where("geo_cell", "in", 주변 셀)
+         .where("seek_segment", "array_contains", 내 세그먼트)
+
+읽은 문서로 요청 전용 임시 CandidateIndex를 만들어, 나머지 필터(정확한 거리,
+나이, 차단)와 점수 계산은 평소와 같은 코드로 처리한다.
+필요한 복합 인덱스는 firestore.indexes.json 에 있다.
+"""
+
+import math
+import threading
+from typing import Any, Dict, List, Optional
+
+from backend.services.candidate_index import INDEX_FIELDS, CandidateIndex
+from backend.services.match_fields import cell_key, match_grid, segment_of
+from backend.services.orientation import gender_bit, seek_mask
+from backend.services.user_table import as_number
+
+# Firestore allows at most 30 values in an "in" filter.
+IN_LIMIT = 30
+
+_lock = threading.Lock()
+_counters = {"requests": 0, "queries": 0, "docs_read": 0}
+
+
+def neighbor_cell_keys(lat: float, lng: float, radius_km: float) -> List[str]:
+    return [cell_key(cell) for cell in match_grid.neighbor_cells(lat, lng, radius_km)]
+
+
+def my_segment(me: Dict[str, Any]) -> str:
+    return segment_of(gender_bit(me.get("gender")), seek_mask(me.get("sexual_orientation")))
+
+
+def segment_index(
+    db, uid: str, radius_km: float, me: Optional[Dict[str, Any]] = None
+) -> CandidateIndex:
+    """
+    A request-scoped CandidateIndex holding `uid` and the users in the cells
+    around them whose seek_segment matches theirs both ways.
+    """
+    users = db.collection("users")
+    reads = 0
+    if me is None:
+        snap = users.document(uid).get(field_paths=list(INDEX_FIELDS))
+        me = (snap.to_dict() or {}) if snap.exists else {}
+        reads += 1
+
+    index = CandidateIndex(db=db, ann_enabled=False)
+    index.upsert(uid, me)
+
+    loc = me.get("location") if isinstance(me.get("location"), dict) else {}
+    lat, lng = as_number(loc.get("lat")), as_number(loc.get("lng"))
+    queries = 0
+    if not (math.isnan(lat) or math.isnan(lng)):
+        cells = neighbor_cell_keys(lat, lng, radius_km)
+        segment = my_segment(me)
+        for start in range(0, len(cells), IN_LIMIT):
+            query = (
+                users.where("geo_cell", "in", cells[start:start + IN_LIMIT])
+                .where("seek_segment", "array_contains", segment)
+                .select(list(INDEX_FIELDS))
+            )
+            queries += 1
+            for doc in query.stream():
+                reads += 1
+                if doc.id != uid:
+                    index.upsert(doc.id, doc.to_dict() or {})
+
+    with _lock:
+        _counters["requests"] += 1
+        _counters["queries"] += queries
+        _counters["docs_read"] += reads
+    return index
+
+
+def stats() -> Dict[str, float]:
+    with _lock:
+        out: Dict[str, float] = dict(_counters)
+    out["reads_per_request"] = (
+        round(out["docs_read"] / out["requests"], 1) if out["requests"] else 0.0
+    )
+    return out
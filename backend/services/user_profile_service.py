@@ -4,8 +4,10 @@ from typing import Iterable, List, Optional
 import numpy as np
 from firebase_admin import firestore
 
+from backend.services.embedding_codec import embedding_fields, read_vector
 from backend.services.embedding_service import normalize_vector
 from backend.services.firestore import get_firestore
+from backend.services.recommend_cache import invalidate_user
 
 def _get_db():
     return get_firestore()
@@ -16,7 +18,7 @@ def _now_ms() -> int:
 
 
 def _as_vector(values: Iterable) -> Optional[List[float]]:
-    if not values:
+    if values is None:
         return None
     try:
         arr = np.array(list(values), dtype=float)
@@ -37,11 +39,10 @@ def update_user_embedding(uid: str, pair_embedding, go: Optional[bool], alpha: f
 
     db = _get_db()
     ref = db.collection("users").document(uid)
-    snap = ref.get()
+    snap = ref.get(field_paths=["embedding"])
     data = snap.to_dict() or {}
 
-    old_vec = (data.get("embedding") or {}).get("vector")
-    old_vec = _as_vector(old_vec)
+    old_vec = _as_vector(read_vector(data.get("embedding")))
 
     pair_arr = np.array(pair_vec, dtype=float)
 
@@ -62,13 +63,13 @@ def update_user_embedding(uid: str, pair_embedding, go: Optional[bool], alpha: f
     ref.set(
         {
             "embedding": {
-                "vector": new_vec,
-                "dim": len(new_vec),
+                **embedding_fields(new_vec),
                 "updated_at": _now_ms(),
             }
         },
         merge=True,
     )
+    invalidate_user(uid)
     return True
 
 
@@ -0,0 +1,95 @@
+"""
+user_projection.py - 다른 사용자에게 보여줄 공개 프로필 필드
+
+추천/목록 응답에는 카드와 플레이리스트 모달에 필요한 필드만 싣는다.
+embedding.vector, onboarding_profile, 트랙의 preview_url/image 같은 무거운 필드는
+Firestore에서 읽지도 않는다.
+
+본인 문서를 그대로 돌려주는 응답(프로필 조회, /api/debug/me)은 user_document()를
+거친다. packed 임베딩은 bytes라 JSON으로 직렬화되지 않는다.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List
+
+from backend.services.embedding_codec import read_vector
+
+# Legacy documents spell names in camelCase; public_profile folds them into
+# first_name/last_name the way the talk history routes read both styles.
+LEGACY_NAME_FIELDS = {"firstName": "first_name", "lastName": "last_name"}
+
+PUBLIC_PROFILE_FIELDS = (
+    "first_name",
+    "last_name",
+    *LEGACY_NAME_FIELDS,
+    "age",
+    "gender",
+    "bio",
+    "playlist",
+)
+
+# What the lounge playlist modal reads from each track.
+TRACK_FIELDS = ("id", "name", "artist", "uri", "duration_ms")
+
+
+def slim_track(track: Any) -> Dict[str, Any]:
+    if not isinstance(track, dict):
+        return {}
+    return {key: track[key] for key in TRACK_FIELDS if track.get(key) is not None}
+
+
+def public_profile(uid: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    profile = {
+        key: data.get(key)
+        for key in PUBLIC_PROFILE_FIELDS
+        if key in data and key not in LEGACY_NAME_FIELDS
+    }
+    for legacy, key in LEGACY_NAME_FIELDS.items():
+        if not profile.get(key) and data.get(legacy):
+            profile[key] = data[legacy]
+    if "playlist" in profile:
+        profile["playlist"] = [slim_track(t) for t in profile["playlist"] or []]
+    profile["id"] = uid
+    return profile
+
+
+def user_document(data: Dict[str, Any], include_embedding: bool = False) -> Dict[str, Any]:
+    """
+    A user's full document made JSON-safe (own profile, debug). The embedding
+    map is dropped, or with include_embedding decoded to a float list; packed
+    embeddings are bytes, which jsonify can't serialize.
+    """
+    doc = {key: value for key, value in data.items() if key != "embedding"}
+    if include_embedding and isinstance(data.get("embedding"), dict):
+        embedding = {k: v for k, v in data["embedding"].items() if k not in ("packed", "vector")}
+        vector = read_vector(data["embedding"])
+        embedding["vector"] = [float(v) for v in vector] if vector is not None else None
+        doc["embedding"] = embedding
+    return doc
+
+
+def iter_public_profiles(
+    db, uids: Iterable[str], chunk_size: int = 100
+) -> Iterator[Dict[str, Any]]:
+    """
+    Public profiles for uids in the given order, one batched read per chunk,
+    so callers can stream the first profiles before later chunks are read.
+    """
+    uids = list(uids)
+    users = db.collection("users")
+    for start in range(0, len(uids), chunk_size):
+        chunk = uids[start:start + chunk_size]
+        refs = [users.document(uid) for uid in chunk]
+        found = {
+            snap.id: snap.to_dict() or {}
+            for snap in db.get_all(refs, field_paths=list(PUBLIC_PROFILE_FIELDS))
+            if snap.exists
+        }
+        for uid in chunk:
+            if uid in found:
+                yield public_profile(uid, found[uid])
+
+
+def fetch_public_profiles(db, uids: Iterable[str]) -> List[Dict[str, Any]]:
+    """Public profiles for uids in one batched read, in the given order."""
+    uids = list(uids)
+    return list(iter_public_profiles(db, uids, chunk_size=max(len(uids), 1)))
@@ -0,0 +1,159 @@
+"""
+user_table.py - 후보 필터링용 컬럼형 사용자 테이블
+
+사용자마다 고정된 row 번호를 주고, 필터에 쓰이는 값을 NumPy 배열 컬럼으로
+보관한다. 성별/성적 지향은 로드 시점에 비트마스크로 바꿔 저장하므로
+필터는 행 단위 문자열 처리 없이 배열 연산만으로 끝난다.
+임베딩은 정규화된 float32 행렬 하나에 row 순서대로 모아 둔다.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.services.orientation import bucket_of, gender_bit, seek_mask
+
+_INITIAL_CAPACITY = 1024
+
+
+def as_number(value) -> float:
+    if isinstance(value, bool) or value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def pref_bound(pref: Dict[str, Any], key: str, default: float) -> float:
+    value = as_number(pref.get(key))
+    return default if math.isnan(value) else value
+
+
+class UserTable:
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        self.ids: List[Optional[str]] = []
+        self.row_of: Dict[str, int] = {}
+        self._free: List[int] = []
+
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.onboarded = np.zeros(capacity, dtype=bool)
+        self.lat = np.full(capacity, np.nan)
+        self.lng = np.full(capacity, np.nan)
+        self.age = np.full(capacity, np.nan)
+        self.gender_bit = np.zeros(capacity, dtype=np.uint8)
+        self.seek_mask = np.zeros(capacity, dtype=np.uint8)
+        self.bucket = np.zeros(capacity, dtype=np.uint8)
+        self.has_age_pref = np.zeros(capacity, dtype=bool)
+        self.age_min = np.zeros(capacity)
+        self.age_max = np.full(capacity, 100.0)
+        self.has_vector = np.zeros(capacity, dtype=bool)
+        # Allocated on the first vector seen; every row shares its dimension.
+        self.vectors: Optional[np.ndarray] = None
+
+    _COLUMNS = (
+        "alive", "onboarded", "lat", "lng", "age", "gender_bit", "seek_mask",
+        "bucket", "has_age_pref", "age_min", "age_max", "has_vector",
+    )
+
+    @property
+    def size(self) -> int:
+        """Number of allocated rows (including dead ones)."""
+        return len(self.ids)
+
+    def _grow(self) -> None:
+        capacity = len(self.alive)
+        for name in self._COLUMNS:
+            col = getattr(self, name)
+            grown = np.empty(capacity * 2, dtype=col.dtype)
+            grown[:capacity] = col
+            grown[capacity:] = _fill_value(name)
+            setattr(self, name, grown)
+        if self.vectors is not None:
+            grown = np.zeros((capacity * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:capacity] = self.vectors
+            self.vectors = grown
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self.vectors is None else self.vectors.shape[1]
+
+    def _set_vector(self, row: int, vector) -> None:
+        self.has_vector[row] = False
+        if vector is None:
+            return
+        try:
+            arr = np.asarray(vector, dtype=np.float32)
+        except (TypeError, ValueError):
+            return
+        if arr.ndim != 1 or arr.size == 0:
+            return
+        if self.vectors is None:
+            self.vectors = np.zeros((len(self.alive), arr.size), dtype=np.float32)
+        if arr.size != self.vectors.shape[1]:
+            return
+        norm = np.linalg.norm(arr)
+        self.vectors[row] = arr / norm if norm > 0 else arr
+        self.has_vector[row] = True
+
+    def vector(self, uid: str) -> Optional[np.ndarray]:
+        """Normalized float32 vector for uid, or None."""
+        row = self.row_of.get(uid)
+        if row is None or not self.has_vector[row]:
+            return None
+        return self.vectors[row]
+
+    def _allocate(self, uid: str) -> int:
+        if self._free:
+            row = self._free.pop()
+            self.ids[row] = uid
+        else:
+            row = len(self.ids)
+            if row >= len(self.alive):
+                self._grow()
+            self.ids.append(uid)
+        self.row_of[uid] = row
+        return row
+
+    def set_row(self, uid: str, record: Dict[str, Any], vector=None) -> int:
+        row = self.row_of.get(uid)
+        if row is None:
+            row = self._allocate(uid)
+
+        loc = record.get("location") or {}
+        age_pref = record.get("age_preference") or {}
+
+        self.alive[row] = True
+        self.onboarded[row] = bool(record.get("onboarding_completed"))
+        self.lat[row] = loc.get("lat", math.nan) if loc else math.nan
+        self.lng[row] = loc.get("lng", math.nan) if loc else math.nan
+        self.age[row] = as_number(record.get("age"))
+        g_bit = gender_bit(record.get("gender"))
+        s_mask = seek_mask(record.get("sexual_orientation"))
+        self.gender_bit[row] = g_bit
+        self.seek_mask[row] = s_mask
+        self.bucket[row] = bucket_of(g_bit, s_mask)
+        self.has_age_pref[row] = bool(age_pref)
+        self.age_min[row] = pref_bound(age_pref, "min", 0.0)
+        self.age_max[row] = pref_bound(age_pref, "max", 100.0)
+        self._set_vector(row, vector)
+        return row
+
+    def drop(self, uid: str) -> Optional[int]:
+        row = self.row_of.pop(uid, None)
+        if row is None:
+            return None
+        self.alive[row] = False
+        self.has_vector[row] = False
+        self.ids[row] = None
+        self._free.append(row)
+        return row
+
+
+def _fill_value(name: str):
+    if name in ("lat", "lng", "age"):
+        return np.nan
+    if name == "age_max":
+        return 100.0
+    return 0